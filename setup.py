@@ -80,6 +80,10 @@ setup(
     entry_points={
         'gui_scripts': [
             'conan_app_launcher=conan_app_launcher.main:main',
+        ],
+        # gui scripts have no console on Windows
+        'console_scripts': [
+            'conan_app_launcher_warm=conan_app_launcher.headless:main',
         ]
     },
 )
@@ -23,6 +23,8 @@ DEBUG_LEVEL = 0
 # must be initialized later, otherwise setup.py can't parse this file
 base_path: Path = Path("NULL")
 default_icon: Path = Path("NULL")
+# folder for persistent caches of conan and config file infos
+cache_path: Path = Path.home() / ".cal_cache"
 
 # qt_application instance
 qt_app: Optional["QtWidgets.QApplication"] = None
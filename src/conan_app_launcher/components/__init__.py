@@ -4,5 +4,9 @@ Settings and base need to be already set up for usage.
 """
 
 from conan_app_launcher.components.conan_worker import ConanWorker, ConanApi
+from conan_app_launcher.components.conan_api_pool import ConanApiPool
+from conan_app_launcher.components.conan_offline import ConanOfflineMode
 from conan_app_launcher.components.config_file import parse_config_file, write_config_file, AppEntry, TabEntry
+from conan_app_launcher.components.config_writer import ConfigFileWriter
 from conan_app_launcher.components.file_runner import run_file
+from conan_app_launcher.components.folder_deleter import FolderDeleter
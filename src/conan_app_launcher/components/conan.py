@@ -1,17 +1,30 @@
+import hashlib
+import os
 import platform
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
 from pathlib import Path
+from threading import Event, Lock
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 try:
     from typing import TypedDict
 except ImportError:
     from typing_extensions import TypedDict
+import conan_app_launcher as this
 from conan_app_launcher.base import Logger
+from conan_app_launcher.components.conan_info_cache import ConanInfoCache
+from conan_app_launcher.components.conan_local_index import ConanLocalIndex
+from conan_app_launcher.components.conan_offline import ConanOfflineMode
+from conan_app_launcher.components.folder_deleter import FolderDeleter
+from conan_app_launcher.components.conan_package_ranking import (DEFAULT_RANKING_WEIGHTS, RankedPkg,
+                                                                  rank_packages)
 from conans import __version__ as conan_version
 from conans.client.conan_api import ClientCache, ConanAPIV1, UserIO
+from conans.errors import ConanConnectionError
 from conans.model.ref import ConanFileReference, PackageReference
 try:
-    from conans.util.windows import CONAN_LINK, CONAN_REAL_PATH, rm_conandir, path_shortener
+    from conans.util.windows import CONAN_LINK, CONAN_REAL_PATH
 except:
     pass
 
@@ -26,13 +39,82 @@ class ConanPkg(TypedDict):
     outdated: bool
 
 
+class ConanResolveResult(TypedDict):
+    """ Small result record of a package resolution, which can be sent between processes """
+
+    ref: str
+    id: str
+    folder: str
+    remote: str  # remote of an installed package, empty if it was already available
+    package_folder_bytes: int  # size of the package folder, if it was installed by this resolution - else 0
+    connection_failed: bool  # no remote could be reached and the offline mode was turned on
+
+
+class ConanProfileSnapshot():
+    """
+    Snapshot of the default profile settings and the remote list of the conan cache, with the package
+    query built from the settings. The files are only parsed again, if their modification time changes.
+    """
+
+    def __init__(self, cache: ClientCache):
+        self._cache = cache
+        self._lock = Lock()
+        self._file_mtimes: Optional[Tuple[float, float]] = None
+        self.settings: Dict[str, str] = {}
+        self.profile_hash = ""
+        self.query = ""
+        self.remotes: List[str] = []  # in order of priority
+        self.remote_objects: Dict[str, Any] = {}
+
+    def update(self) -> "ConanProfileSnapshot":
+        """ Reload the snapshot, if the profile or the remotes file changed since the last call """
+        file_mtimes = (self._get_mtime(self._cache.default_profile_path),
+                       self._get_mtime(getattr(self._cache, "remotes_path", "")))
+        if file_mtimes == self._file_mtimes:
+            return self
+        with self._lock:
+            settings: Dict[str, str] = dict(self._cache.default_profile.settings)
+            remotes: List[str] = []
+            remote_objects: Dict[str, Any] = {}
+            remote_registry = self._cache.registry.load_remotes()
+            for remote in remote_registry.items():
+                if not isinstance(remote, str) and len(remote) > 0:  # only check for len, can be an object or a list
+                    remote, remote_object = remote[0], remote[-1]  # for old apis
+                else:
+                    remote_object = remote_registry[remote]
+                remotes.append(remote)
+                remote_objects[remote] = remote_object
+            self.settings = settings
+            self.profile_hash = hashlib.sha1(str(sorted(settings.items())).encode("utf-8")).hexdigest()
+            self.query = f"(arch=None OR arch={settings.get('arch')})" \
+                         f" AND (arch_build=None OR arch_build={settings.get('arch_build')})" \
+                         f" AND (os=None OR os={settings.get('os')})"\
+                         f" AND (os_build=None OR os_build={settings.get('os_build')})"
+            self.remotes = remotes
+            self.remote_objects = remote_objects
+            self._file_mtimes = file_mtimes
+        return self
+
+    @staticmethod
+    def _get_mtime(file_path: str) -> float:
+        try:
+            return os.stat(file_path).st_mtime
+        except OSError:  # does not exist (yet)
+            return 0.0
+
+
 class ConanApi():
     """ Wrapper around ConanAPIV1 """
+    REMOTE_SEARCH_TIMEOUT_S = 30
 
-    def __init__(self):
+    def __init__(self, info_cache: Optional[ConanInfoCache] = None):
         self.conan: ConanAPIV1 = None
         self.cache: ClientCache = None
         self.user_io: UserIO = None
+        self.local_index: ConanLocalIndex = None
+        self.profile_snapshot: ConanProfileSnapshot = None
+        self.info_cache = info_cache if info_cache else ConanInfoCache(this.cache_path)
+        self.ranking_weights: Dict[str, int] = dict(DEFAULT_RANKING_WEIGHTS)
         self.init_api()
 
     def init_api(self):
@@ -41,65 +123,105 @@ class ConanApi():
         self.conan.create_app()
         self.user_io = self.conan.user_io
         self.cache = self.conan.app.cache
+        self.local_index = ConanLocalIndex(self.cache)
+        self.profile_snapshot = ConanProfileSnapshot(self.cache)
 
     def get_cleanup_cache_paths(self) -> List[str]:
         """ Get a list of orphaned short path and cache folders """
+        return [path for _, _, path in self.iter_cleanup_cache_paths() if path]
+
+    def iter_cleanup_cache_paths(self, cancel: Optional[Event] = None,
+                                 max_workers: int = 8) -> Iterator[Tuple[int, int, str]]:
+        """
+        Search for orphaned short path and cache folders and yield the progress with every checked ref
+        and short path folder as (checked, all, orphaned folder or an empty string).
+        The package folders of every ref are listed with scandir and checked in parallel.
+        Setting the cancel event stops the search.
+        """
         # Blessed are the users Microsoft products!
         if not platform.system() == "Windows":
-            return []
-        del_list = []
-        # search for orphaned refs
-        for ref in self.cache.all_refs():
-            ref_cache = self.cache.package_layout(ref)
-            for pkg_id in ref_cache.packages_ids():
-                short_path_dir = self.get_package_folder(ref, {"id": pkg_id})
-                pkg_id_dir = Path(ref_cache.packages()) / pkg_id
-                if not short_path_dir.exists():
-                    Logger().debug(f"Can't find {str(short_path_dir)} for {str(ref)}")
-                    del_list.append(str(pkg_id_dir))
-
-        # reverse search for orphaned packages on windows short paths
-        short_path = Path(path_shortener("C:/temp", True)).parent.parent
-        short_path_folders = [f for f in Path(short_path).iterdir() if f.is_dir()]
-        for short_path in short_path_folders:
-            rp_file = short_path / CONAN_REAL_PATH
-            if rp_file.is_file():
-                with open(str(rp_file)) as fp:
-                    real_path = fp.read()
-                try:
-                    if not Path(real_path).is_dir():
-                        Logger().debug(f"Can't find {real_path} for {str(short_path)}")
-                        del_list.append(str(short_path))
-                except:
-                    Logger().error(f"Can't read {CONAN_REAL_PATH} in {str(short_path)}")
+            return
+        # search for orphaned refs and reverse search for orphaned packages on windows short paths
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ConanCleanupScan")
+        futures = [executor.submit(_find_orphaned_package_folders, self.cache.package_layout(ref).packages())
+                   for ref in self.cache.all_refs()]
+        futures += [executor.submit(_find_orphaned_short_path_folder, short_path_folder)
+                    for short_path_folder in _list_folders(self._get_short_paths_home())]
+        try:
+            for checked_num, future in enumerate(as_completed(futures), 1):
+                if cancel and cancel.is_set():
+                    return
+                orphaned_folders = future.result()
+                if isinstance(orphaned_folders, str):  # of a short path folder
+                    orphaned_folders = [orphaned_folders]
+                for orphaned_folder in orphaned_folders or [""]:
+                    yield checked_num, len(futures), orphaned_folder
+        finally:
+            for future in futures:
+                future.cancel()  # only possible for not yet started checks
+            executor.shutdown(wait=False)
+
+    def get_cleanup_trash_dirs(self) -> List[str]:
+        """
+        Get the trash dirs for deleting cache folders. They are next to the storage and short paths folders,
+        so they are on the same drive, but conan doesn't see them as a ref, package or short path.
+        """
+        return [os.path.join(os.path.dirname(os.path.normpath(folder)), FolderDeleter.TRASH_DIR_NAME)
+                for folder in [str(self.cache.store), self._get_short_paths_home()]]
 
-        return del_list
+    def _get_short_paths_home(self) -> str:
+        """ Get the folder of the windows short paths, like conan determines it """
+        short_home = os.getenv("CONAN_USER_HOME_SHORT")
+        if not short_home:
+            drive = os.path.splitdrive(str(self.cache.store))[0]
+            short_home = os.path.join(drive, os.sep, ".conan")
+        return short_home
 
     def get_path_or_install(self, conan_ref: ConanFileReference, input_options: Dict[str, str] = {}) -> Path:
         """ Return the package folder of a conan reference and install it, if it is not available """
+        return Path(self.resolve_package(conan_ref, input_options)["folder"])
+
+    def resolve_package(self, conan_ref: ConanFileReference,
+                        input_options: Dict[str, str] = {}) -> ConanResolveResult:
+        """ Find the best matching package and install it, if it is not available """
+        result = get_unresolved_result(conan_ref)
+        profile_hash = self.profile_snapshot.update().profile_hash
+        cached_package = self.info_cache.get_package(conan_ref, input_options, profile_hash)
+        if cached_package:
+            result.update({"id": cached_package[0], "folder": str(cached_package[1])})
+            return result
 
         package = self.get_local_package(conan_ref, input_options)
-        if package:
-            return self.get_package_folder(conan_ref, package)
-
-        packages: List[ConanPkg] = self.search_in_remotes(conan_ref, input_options)
-        if not packages:
-            return Path("NULL")
-
-        # TODO which one to install?
-        if self.install_package(conan_ref, packages[0]):
+        remote = ""
+        if not package:
+            remote, packages = self._search_best_packages_in_remotes(conan_ref, input_options)
+            if not packages:
+                return result
+            if not self.install_package(conan_ref, self.select_best_package(conan_ref, packages, input_options)):
+                return result
             package = self.get_local_package(conan_ref, input_options)
-            return self.get_package_folder(conan_ref, package)
-        return Path("NULL")
+        if not package:
+            return result
+
+        package_folder = self.get_package_folder(conan_ref, package)
+        self.info_cache.update_package(conan_ref, input_options, profile_hash, package["id"], package_folder)
+        result.update({"id": package["id"], "folder": str(package_folder), "remote": remote,
+                       "package_folder_bytes": _get_folder_size(str(package_folder)) if remote else 0})
+        return result
 
     def search_for_all_recipes(self, conan_ref: ConanFileReference) -> List[ConanFileReference]:
-        """ Sreach in all remotes for all versions of a conan ref """
+        """ Sreach in all remotes for all versions of a conan ref. The result is saved in the info cache. """
         res_list = []
+        if ConanOfflineMode().is_offline:  # only the cached results are available
+            return []
+        pattern = self.get_recipes_search_pattern(conan_ref)
         try:
             # no query possible with pattern
-            search_results = self.conan.search_recipes(f"{conan_ref.name}/*@{conan_ref.user}/*",
-                                                       remote_name="all").get("results", None)
-
+            search_results = self.conan.search_recipes(pattern, remote_name="all").get("results", None)
+        except ConanConnectionError:
+            self.profile_snapshot.update()
+            self.report_connection_error()
+            return []
         except Exception:
             return []
         for res in search_results:
@@ -107,28 +229,98 @@ class ConanApi():
                 res_list.append(ConanFileReference.loads(item.get("recipe", {}).get("id", "")))
         res_list = list(set(res_list))  # make unique
         res_list.sort()
+        self.info_cache.update_recipes(pattern, [str(ref) for ref in res_list])
         return res_list
 
+    def get_cached_recipes(self, conan_ref: ConanFileReference) -> Tuple[List[ConanFileReference], float]:
+        """
+        Get the result of the last search_for_all_recipes from the info cache and its age in seconds.
+        Returns an empty list with infinite age, if nothing is cached.
+        """
+        cached_recipes = self.info_cache.get_recipes(self.get_recipes_search_pattern(conan_ref))
+        if not cached_recipes:
+            return [], float("inf")
+        refs, age = cached_recipes
+        return [ConanFileReference.loads(ref) for ref in refs], age
+
+    @staticmethod
+    def get_recipes_search_pattern(conan_ref: ConanFileReference) -> str:
+        """ Pattern to search for all versions and channels of a conan ref """
+        return f"{conan_ref.name}/*@{conan_ref.user}/*"
+
     def search_in_remotes(self, conan_ref: ConanFileReference, input_options: Dict[str, str] = {}) -> List[ConanPkg]:
-        """ Find a package with options in the remotes """
-        remotes = self.cache.registry.load_remotes()
-        for remote in remotes.items():
-            if not isinstance(remote, str) and len(remote) > 0:  # only check for len, can be an object or a list
-                remote = remote[0]  # for old apis
-            packages = self.find_best_matching_packages(conan_ref, input_options, remote)
-            if packages:
-                return packages
+        """
+        Find a package with options in the remotes.
+        All remotes are searched concurrently, but the result of the remote with the highest priority is used.
+        """
+        return self._search_best_packages_in_remotes(conan_ref, input_options)[1]
+
+    def _search_best_packages_in_remotes(self, conan_ref: ConanFileReference,
+                                         input_options: Dict[str, str] = {}) -> Tuple[str, List[ConanPkg]]:
+        """ Implementation of search_in_remotes, which also returns the remote of the found packages """
+        if ConanOfflineMode().is_offline:
+            Logger().debug(f"Offline mode - not searching for '{str(conan_ref)}' in the remotes")
+            return "", []
+        profile_snapshot = self.profile_snapshot.update()
+        remotes = profile_snapshot.remotes
+        remote_manager = self.conan.app.remote_manager
+        executor = ThreadPoolExecutor(max_workers=max(1, len(remotes)), thread_name_prefix="RemoteSearch")
+        futures = [executor.submit(self._search_packages_in_remote, remote_manager,
+                                   profile_snapshot.remote_objects.get(remote), conan_ref, profile_snapshot.query)
+                   for remote in remotes]
+        # all searches start at the same time, so a common deadline is the timeout for every remote
+        deadline = time.monotonic() + self.REMOTE_SEARCH_TIMEOUT_S
+        unreachable_remotes = 0
+        try:
+            for remote, future in zip(remotes, futures):
+                try:
+                    found_pkgs = future.result(max(0.0, deadline - time.monotonic()))
+                    # choosing between packages inspects the recipe, which can fail for one remote
+                    packages = self._filter_best_packages(conan_ref, found_pkgs, input_options)
+                except TimeoutError:
+                    Logger().warning(f"Search for '{str(conan_ref)}' in remote '{remote}' timed out")
+                    unreachable_remotes += 1
+                    continue
+                except ConanConnectionError:
+                    unreachable_remotes += 1
+                    continue
+                except Exception:  # no problem, next
+                    continue
+                if packages:
+                    return remote, packages
+        finally:
+            # results of remotes with lower priority are not needed anymore
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+        if remotes and unreachable_remotes == len(remotes):
+            self.report_connection_error()
+            return "", []
         Logger().warning(f"Can't find a matching package '{str(conan_ref)}' in the remotes")
-        return []
+        return "", []
+
+    def report_connection_error(self):
+        """ No remote can be reached - switch to offline mode """
+        ConanOfflineMode().report_connection_error(
+            [getattr(remote, "url", "") for remote in self.profile_snapshot.remote_objects.values()])
 
     def get_local_package(self, conan_ref: ConanFileReference, input_options: Dict[str, str] = {}) -> Optional[ConanPkg]:
         """ Find a package in the local cache """
         packages = self.find_best_matching_packages(conan_ref, input_options)
-        # TODO what to if multiple ones exits? - for now simply take the first entry
         if packages:
-            return packages[0]
+            return self.select_best_package(conan_ref, packages, input_options)
         return None
 
+    def select_best_package(self, conan_ref: ConanFileReference, packages: List[ConanPkg],
+                            input_options: Dict[str, str] = {}) -> ConanPkg:
+        """ Select the best ranked package - of equally ranked packages the one with the lowest id """
+        if len(packages) == 1:
+            return packages[0]
+        ranked_pkgs = self.rank_packages(conan_ref, packages, input_options)
+        best_score = ranked_pkgs[0]["score"]
+        return min((ranked_pkg["package"] for ranked_pkg in ranked_pkgs if ranked_pkg["score"] == best_score),
+                   key=lambda package: package["id"])
+
     def get_package_folder(self, conan_ref: ConanFileReference, package: Optional[ConanPkg]) -> Path:
         """ Get the fully resolved package path from the reference and the specific package (id) """
         try:
@@ -149,6 +341,9 @@ class ConanApi():
         Try to install a conan package while guessing the mnost suitable package
         for the current platform.
         """
+        if ConanOfflineMode().is_offline:
+            Logger().warning(f"Offline mode - can't install package '{str(conan_ref)}'")
+            return False
         package_id = package["id"]
         options_list = _create_key_value_pair_list(package["options"])
         settings_list = _create_key_value_pair_list(package["settings"])
@@ -157,6 +352,7 @@ class ConanApi():
         try:
             self.conan.install_reference(conan_ref, update=True,
                                          settings=settings_list, options=options_list)
+            self.local_index.update_ref(conan_ref)
             return True
         except BaseException as error:
             Logger().error(f"Can't install package '{str(conan_ref)}': {str(error)}")
@@ -169,27 +365,36 @@ class ConanApi():
         based on the users machine and the supplied options.
         """
         found_pkgs: List[ConanPkg] = []
-        default_settings: Dict[str, str] = dict(self.cache.default_profile.settings)
+        profile_snapshot = self.profile_snapshot.update()
+        if remote and ConanOfflineMode().is_offline:
+            return []
         try:
-            query = f"(arch=None OR arch={default_settings.get('arch')})" \
-                    f" AND (arch_build=None OR arch_build={default_settings.get('arch_build')})" \
-                    f" AND (os=None OR os={default_settings.get('os')})"\
-                    f" AND (os_build=None OR os_build={default_settings.get('os_build')})"
-
-            search_results = self.conan.search_packages(str(conan_ref), query=query,
-                                                        remote_name=remote).get("results", None)
-            found_pkgs = search_results[0].get("items")[0].get("packages")
+            if remote:
+                found_pkgs = self._search_packages_in_remote(
+                    self.conan.app.remote_manager, profile_snapshot.remote_objects[remote],
+                    conan_ref, profile_snapshot.query)
+            else:  # local packages are looked up in the index
+                found_pkgs = self.local_index.search_packages(conan_ref, profile_snapshot.query)
         except Exception:  # no problem, next
             return []
+        return self._filter_best_packages(conan_ref, found_pkgs, input_options)
 
-        # remove debug releases
-        no_debug_pkgs = list(filter(lambda pkg: pkg["settings"].get(
-            "build_type", "").lower() != "debug", found_pkgs))
-        # check, if a package remained and only then take the result
-        if no_debug_pkgs:
-            found_pkgs = no_debug_pkgs
-
-        # filter the found packages by the user options
+    @staticmethod
+    def _search_packages_in_remote(remote_manager: Any, remote: Any, conan_ref: ConanFileReference,
+                                   query: str) -> List[ConanPkg]:
+        """
+        Search packages directly with the remote manager of the conan app.
+        The api methods of ConanAPIV1 recreate the app on every call, so they can't be used concurrently.
+        """
+        packages_props = remote_manager.search_packages(remote, conan_ref, query)
+        return [{"id": package_id, "options": props.get("options", {}), "settings": props.get("settings", {}),
+                 "requires": props.get("requires", []) or props.get("full_requires", []), "outdated": False}
+                for package_id, props in sorted(packages_props.items())]
+
+    def _filter_best_packages(self, conan_ref: ConanFileReference, found_pkgs: List[ConanPkg],
+                              input_options: Dict[str, str] = {}) -> List[ConanPkg]:
+        """ Reduce the found packages to the best scored ones for the users machine and the supplied options """
+        # the user options are a hard requirement
         if input_options:
             found_pkgs = list(filter(lambda pkg: input_options.items() <=
                                      pkg["options"].items(), found_pkgs))
@@ -197,39 +402,52 @@ class ConanApi():
                 Logger().warning(
                     f"Can't find a matching package '{str(conan_ref)}' for options {str(input_options)}")
                 return found_pkgs
-        # get a set of existing options and reduce default options with them
-        min_opts_set = set(map(lambda pkg: frozenset(tuple(pkg["options"].keys())), found_pkgs))
-        min_opts_list = frozenset()
-        if min_opts_set:
-            min_opts_list = min_opts_set.pop()
-
+        # nothing to choose from - skip inspecting the recipe
+        if len(found_pkgs) <= 1:
+            return found_pkgs
+        ranked_pkgs = self.rank_packages(conan_ref, found_pkgs, input_options)
+        best_score = ranked_pkgs[0]["score"]
+        Logger().debug(f"Best package match for {str(conan_ref)}: {', '.join(ranked_pkgs[0]['explanation'])}")
+        return [ranked_pkg["package"] for ranked_pkg in ranked_pkgs if ranked_pkg["score"] == best_score]
+
+    def rank_packages(self, conan_ref: ConanFileReference, found_pkgs: List[ConanPkg],
+                      input_options: Dict[str, str] = {}) -> List[RankedPkg]:
+        """ Score the found packages against the users machine and the supplied options, best match first """
+        return rank_packages(found_pkgs, self.profile_snapshot.settings, self.get_default_options(conan_ref),
+                             input_options, self.ranking_weights)
+
+    def get_default_options(self, conan_ref: ConanFileReference) -> Dict[str, Any]:
+        """
+        Get the default options of a recipe. Inspecting loads (and possibly downloads) the recipe,
+        so the result is cached per recipe revision, as long as the export folder is unchanged.
+        """
+        recipe_revision, export_mtime = self._get_recipe_state(conan_ref)
+        if recipe_revision:
+            default_options = self.info_cache.get_default_options(conan_ref, recipe_revision, export_mtime)
+            if default_options is not None:
+                return default_options
+        elif ConanOfflineMode().is_offline:  # the recipe would be downloaded
+            return {}
         default_options = self._resolve_default_options(
             self.conan.inspect(str(conan_ref), attributes=["default_options"]).get("default_options", {}))
+        # recipe is available locally after inspect
+        recipe_revision, export_mtime = self._get_recipe_state(conan_ref)
+        if recipe_revision:
+            self.info_cache.update_default_options(conan_ref, recipe_revision, export_mtime,
+                                                   default_options if default_options else {})
+        return default_options
 
-        if default_options:
-            default_options = dict(filter(lambda opt: opt[0] in min_opts_list, default_options.items()))
-            # patch user input into default options to combine the two
-            default_options.update(input_options)
-            # convert vals to string
-            default_str_options: Dict[str, str] = dict([key, str(value)]
-                                                       for key, value in default_options.items())
-            if len(found_pkgs) > 1:
-                found_pkgs = list(filter(lambda pkg: default_str_options.items() <=
-                                         pkg["options"].items(), found_pkgs))
-
-        # now we have all mathcing packages, but with potentially different compilers
-        # reduce with default settings
-        if len(found_pkgs) > 1:
-            same_comp_pkgs = list(filter(lambda pkg: default_settings.get("compiler", "") ==
-                                         pkg["settings"].get("compiler", ""), found_pkgs))
-            if same_comp_pkgs:
-                found_pkgs = same_comp_pkgs
-
-            same_comp_version_pkgs = list(filter(lambda pkg: default_settings.get("compiler.version", "") ==
-                                                 pkg["settings"].get("compiler.version", ""), found_pkgs))
-            if same_comp_version_pkgs:
-                found_pkgs = same_comp_version_pkgs
-        return found_pkgs
+    def _get_recipe_state(self, conan_ref: ConanFileReference) -> Tuple[str, float]:
+        """ Get the revision of the local recipe and the last modification time of its export folder """
+        try:
+            layout = self.cache.package_layout(conan_ref)
+            export_folder = Path(layout.export())
+            export_mtime = max(export_folder.stat().st_mtime,
+                               (export_folder / "conanmanifest.txt").stat().st_mtime)
+            recipe_revision = layout.load_metadata().recipe.revision
+            return str(recipe_revision if recipe_revision else "0"), export_mtime
+        except Exception:  # recipe is not in the local cache
+            return "", 0.0
 
     @staticmethod
     def _resolve_default_options(default_options_ret: Any) -> Dict[str, Any]:
@@ -247,6 +465,68 @@ class ConanApi():
         return default_options
 
 
+def get_unresolved_result(conan_ref: ConanFileReference) -> ConanResolveResult:
+    """ Result record of a package, which could not be resolved """
+    return {"ref": str(conan_ref), "id": "", "folder": "NULL", "remote": "", "package_folder_bytes": 0,
+            "connection_failed": False}
+
+
+def _get_folder_size(path: str) -> int:
+    """ Sum up the sizes of all files in a folder """
+    size = 0
+    for root, _, file_names in os.walk(path):
+        for file_name in file_names:
+            try:
+                size += os.lstat(os.path.join(root, file_name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+def _list_folders(path: str) -> List[str]:
+    """ List the sub folders of a path. A not existing path has no sub folders. """
+    try:
+        with os.scandir(path) as entries:
+            return [entry.path for entry in entries if entry.is_dir()]
+    except OSError:
+        return []
+
+
+def _find_orphaned_package_folder(package_folder: str) -> str:
+    """ Return the package folder, if it links to a not existing short path folder """
+    try:
+        with open(os.path.join(package_folder, CONAN_LINK)) as link_file:
+            short_path_folder = link_file.read()
+    except OSError:  # no short path package
+        return ""
+    if os.path.isdir(short_path_folder):
+        return ""
+    Logger().debug(f"Can't find {short_path_folder} for {package_folder}")
+    return package_folder
+
+
+def _find_orphaned_package_folders(packages_folder: str) -> List[str]:
+    """ Return the package folders of a ref, which link to a not existing short path folder """
+    orphaned_folders = map(_find_orphaned_package_folder, _list_folders(packages_folder))
+    return [orphaned_folder for orphaned_folder in orphaned_folders if orphaned_folder]
+
+
+def _find_orphaned_short_path_folder(short_path_folder: str) -> str:
+    """ Return the short path folder, if its real path does not exist anymore """
+    try:
+        with open(os.path.join(short_path_folder, CONAN_REAL_PATH)) as real_path_file:
+            real_path = real_path_file.read()
+    except FileNotFoundError:  # no short path folder of conan
+        return ""
+    except OSError:
+        Logger().error(f"Can't read {CONAN_REAL_PATH} in {short_path_folder}")
+        return ""
+    if os.path.isdir(real_path):
+        return ""
+    Logger().debug(f"Can't find {real_path} for {short_path_folder}")
+    return short_path_folder
+
+
 def _create_key_value_pair_list(input_dict: Dict[str, str]) -> List[str]:
     """
     Helper to create name=value string list from dict
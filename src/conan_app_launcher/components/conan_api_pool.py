@@ -0,0 +1,132 @@
+import time
+from contextlib import contextmanager
+from threading import Lock, Timer
+from typing import Iterator, List, Optional, Set
+
+from conan_app_launcher.base import Logger
+from conan_app_launcher.components.conan import ConanApi
+
+
+class ConanApiPool():
+    """
+    Singleton pool of initialized ConanApi instances for the whole application.
+    A ConanApi is not thread safe, so an instance is leased exclusively and returned after usage.
+    Returned instances are kept warm until they were idle longer than the idle timeout - a timer evicts them,
+    even if the pool is not used anymore.
+    """
+    _instance: Optional["ConanApiPool"] = None
+    _instance_lock = Lock()
+
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                instance = super().__new__(cls)
+                instance._init_pool()
+                cls._instance = instance
+            return cls._instance
+
+    def _init_pool(self):
+        self._lock = Lock()
+        self._idle: List[ConanApi] = []  # last returned is leased first
+        self._idle_since: List[float] = []
+        self._broken: Set[int] = set()  # ids of instances, which raised an error while leased
+        self._idle_timeout_s: float = 600
+        self._evict_timer: Optional[Timer] = None
+
+    @property
+    def idle_timeout_s(self) -> float:
+        return self._idle_timeout_s
+
+    @idle_timeout_s.setter
+    def idle_timeout_s(self, new_value: float):
+        with self._lock:
+            self._idle_timeout_s = new_value
+            self._cancel_eviction()
+            self._schedule_eviction()
+
+    def lease(self) -> ConanApi:
+        """ Get a warm ConanApi from the pool or create a new one, if none is idle """
+        with self._lock:
+            self._evict_idle()
+            if not self._idle:
+                conan = None
+            else:
+                self._idle_since.pop()
+                conan = self._idle.pop()
+                is_broken = id(conan) in self._broken
+                self._broken.discard(id(conan))
+        if conan is None:
+            return ConanApi()
+        # health check - only a broken instance is initialized again
+        if is_broken or not conan.conan:
+            Logger().debug("Reinitializing broken conan api")
+            conan.init_api()
+        return conan
+
+    def release(self, conan: ConanApi, broken: bool = False):
+        """ Return a leased ConanApi. A broken instance is reinitialized, before it is leased again. """
+        with self._lock:
+            if broken:
+                self._broken.add(id(conan))
+            self._idle.append(conan)
+            self._idle_since.append(time.monotonic())
+            self._evict_idle()
+            self._schedule_eviction()
+
+    @contextmanager
+    def leased(self) -> Iterator[ConanApi]:
+        """ Lease a ConanApi for a with block. An exception in the block marks the instance as broken. """
+        conan = self.lease()
+        broken = False
+        try:
+            yield conan
+        except BaseException:
+            broken = True
+            raise
+        finally:
+            self.release(conan, broken)
+
+    def clear(self):
+        """ Drop all idle instances """
+        with self._lock:
+            self._idle = []
+            self._idle_since = []
+            self._broken = set()
+            self._cancel_eviction()
+
+    def _evict_idle(self):
+        """ Drop instances, which were not used for the idle timeout. Must be called with the lock held. """
+        evict_before = time.monotonic() - self._idle_timeout_s
+        # the oldest instances are at the beginning
+        evict_num = 0
+        while evict_num < len(self._idle_since) and self._idle_since[evict_num] < evict_before:
+            self._broken.discard(id(self._idle[evict_num]))
+            evict_num += 1
+        if evict_num:
+            del self._idle[:evict_num]
+            del self._idle_since[:evict_num]
+            Logger().debug(f"Evicted {evict_num} idle conan api instances")
+
+    def _schedule_eviction(self):
+        """ Start the timer for the oldest idle instance, if needed. Must be called with the lock held. """
+        if self._evict_timer or not self._idle_since:
+            return
+        delay_s = max(0.0, self._idle_since[0] + self._idle_timeout_s - time.monotonic())
+        timer = Timer(delay_s, lambda: self._on_evict_timer(timer))
+        timer.daemon = True
+        timer.start()
+        self._evict_timer = timer
+
+    def _cancel_eviction(self):
+        """ Must be called with the lock held """
+        if self._evict_timer:
+            self._evict_timer.cancel()
+            self._evict_timer = None
+
+    def _on_evict_timer(self, timer: Timer):
+        with self._lock:
+            if timer is not self._evict_timer:  # cancelled, while waiting for the lock
+                return
+            self._evict_timer = None
+            self._evict_idle()
+            self._schedule_eviction()
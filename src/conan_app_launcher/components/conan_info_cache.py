@@ -0,0 +1,193 @@
+import atexit
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from threading import Lock, Timer
+from typing import Any, Dict, List, Optional, Tuple
+
+from conans.model.ref import ConanFileReference
+
+from conan_app_launcher.base import Logger
+
+
+class ConanInfoCache():
+    """
+    Persistent json storage for results of expensive conan operations.
+    There is one instance per cache file, so that multiple ConanApi objects don't overwrite each other.
+    Changes are collected and written at once after a delay and on exit.
+    """
+    _instances: Dict[Path, "ConanInfoCache"] = {}
+    _instances_lock = Lock()
+
+    CACHE_FILE_NAME = "conan_info_cache.json"
+    SAVE_DELAY_S = 2.0
+    _PACKAGES_SECTION = "packages"
+    _DEFAULT_OPTIONS_SECTION = "default_options"
+    _RECIPES_SECTION = "recipes"
+
+    def __new__(cls, cache_dir: Path):
+        cache_file = Path(cache_dir) / cls.CACHE_FILE_NAME
+        with cls._instances_lock:
+            if cache_file not in cls._instances:
+                instance = super().__new__(cls)
+                instance._init_cache(cache_file)
+                cls._instances[cache_file] = instance
+            return cls._instances[cache_file]
+
+    def _init_cache(self, cache_file: Path):
+        self._cache_file = cache_file
+        self._lock = Lock()
+        self._save_lock = Lock()  # a flush can run concurrently to a timed save
+        self._dirty = False
+        self._save_timer: Optional[Timer] = None
+        self._data: Dict[str, Dict] = {self._PACKAGES_SECTION: {}, self._DEFAULT_OPTIONS_SECTION: {},
+                                       self._RECIPES_SECTION: {}}
+        self._load()
+
+    def get_package(self, conan_ref: ConanFileReference, options: Dict[str, str],
+                    profile_hash: str) -> Optional[Tuple[str, Path]]:
+        """
+        Get the cached package id and folder of a resolved package.
+        The entry is only valid, if the package folder still exists and was not modified since.
+        """
+        key = self._get_package_key(conan_ref, options, profile_hash)
+        with self._lock:
+            entry = self._data[self._PACKAGES_SECTION].get(key)
+        if not entry:
+            return None
+        package_folder = Path(entry.get("folder", "NULL"))
+        try:
+            if package_folder.stat().st_mtime == entry.get("mtime"):
+                return entry.get("id", ""), package_folder
+        except OSError:  # folder does not exist anymore
+            pass
+        Logger().debug(f"Cached package info for {str(conan_ref)} is outdated")
+        self.invalidate_package(conan_ref, options, profile_hash)
+        return None
+
+    def update_package(self, conan_ref: ConanFileReference, options: Dict[str, str], profile_hash: str,
+                       package_id: str, package_folder: Path):
+        """ Save a resolved package with the current modification time of its folder """
+        try:
+            mtime = package_folder.stat().st_mtime
+        except OSError:  # only existing folders can be cached
+            return
+        key = self._get_package_key(conan_ref, options, profile_hash)
+        with self._lock:
+            self._data[self._PACKAGES_SECTION][key] = {
+                "id": package_id, "folder": str(package_folder), "mtime": mtime}
+            self._mark_dirty()
+
+    def invalidate_package(self, conan_ref: ConanFileReference, options: Dict[str, str], profile_hash: str):
+        """ Remove a resolved package from the cache """
+        key = self._get_package_key(conan_ref, options, profile_hash)
+        with self._lock:
+            if self._data[self._PACKAGES_SECTION].pop(key, None):
+                self._mark_dirty()
+
+    def get_default_options(self, conan_ref: ConanFileReference, revision: str,
+                            export_mtime: float) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached default options of a recipe revision.
+        The entry is only valid, if the export folder of the recipe was not modified since.
+        """
+        key = f"{str(conan_ref)}#{revision}"
+        with self._lock:
+            entry = self._data[self._DEFAULT_OPTIONS_SECTION].get(key)
+        if not entry:
+            return None
+        if entry.get("mtime") != export_mtime:
+            Logger().debug(f"Cached default options for {str(conan_ref)} are outdated")
+            self.invalidate_default_options(conan_ref, revision)
+            return None
+        return dict(entry.get("options", {}))
+
+    def update_default_options(self, conan_ref: ConanFileReference, revision: str, export_mtime: float,
+                               default_options: Dict[str, Any]):
+        """ Save the default options of a recipe revision with the modification time of its export folder """
+        key = f"{str(conan_ref)}#{revision}"
+        with self._lock:
+            self._data[self._DEFAULT_OPTIONS_SECTION][key] = {"options": default_options, "mtime": export_mtime}
+            self._mark_dirty()
+
+    def invalidate_default_options(self, conan_ref: ConanFileReference, revision: str):
+        """ Remove the default options of a recipe revision from the cache """
+        with self._lock:
+            if self._data[self._DEFAULT_OPTIONS_SECTION].pop(f"{str(conan_ref)}#{revision}", None):
+                self._mark_dirty()
+
+    def get_recipes(self, pattern: str) -> Optional[Tuple[List[str], float]]:
+        """ Get the cached refs found with a search pattern and the age of this result in seconds """
+        with self._lock:
+            entry = self._data[self._RECIPES_SECTION].get(pattern)
+        if not entry:
+            return None
+        return list(entry.get("refs", [])), time.time() - entry.get("time", 0.0)
+
+    def update_recipes(self, pattern: str, refs: List[str]):
+        """ Save the refs found with a search pattern with the current time """
+        with self._lock:
+            self._data[self._RECIPES_SECTION][pattern] = {"refs": refs, "time": time.time()}
+            self._mark_dirty()
+
+    def flush(self):
+        """ Write the pending changes immediately """
+        with self._save_lock:
+            with self._lock:
+                if self._save_timer:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                content = json.dumps(self._data)
+            self._save(content)
+
+    @classmethod
+    def flush_all(cls):
+        """ Write the pending changes of all caches, e.g. before exiting """
+        with cls._instances_lock:
+            instances = list(cls._instances.values())
+        for instance in instances:
+            instance.flush()
+
+    @staticmethod
+    def _get_package_key(conan_ref: ConanFileReference, options: Dict[str, str], profile_hash: str) -> str:
+        options_str = ",".join(f"{name}={value}" for name, value in sorted(options.items()))
+        return f"{str(conan_ref)}|{options_str}|{profile_hash}"
+
+    def _load(self):
+        """ Read the cache file. A missing or corrupt file results in an empty cache. """
+        if not self._cache_file.is_file():
+            return
+        try:
+            with open(str(self._cache_file), encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+            for section in self._data:
+                self._data[section].update(data.get(section, {}))
+        except Exception as error:
+            Logger().debug(f"Can't read cache file {str(self._cache_file)}: {str(error)}")
+
+    def _mark_dirty(self):
+        """ Schedule a write of the changes. Must be called with the lock held. """
+        self._dirty = True
+        if self._save_timer is None:
+            self._save_timer = Timer(self.SAVE_DELAY_S, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _save(self, content: str):
+        """ Write the cache file atomically, so that it can't be corrupted """
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=str(self._cache_file.parent), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+                temp_file.write(content)
+            os.replace(temp_path, str(self._cache_file))
+        except Exception as error:
+            Logger().debug(f"Can't write cache file {str(self._cache_file)}: {str(error)}")
+
+
+atexit.register(ConanInfoCache.flush_all)
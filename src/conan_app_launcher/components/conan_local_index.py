@@ -0,0 +1,103 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+
+from conans.client.conan_api import ClientCache
+from conans.model.info import ConanInfo
+from conans.model.ref import ConanFileReference
+from conans.paths import CONANINFO
+from conans.search.search import filter_packages
+
+from conan_app_launcher.base import Logger
+
+if TYPE_CHECKING:
+    from conan_app_launcher.components.conan import ConanPkg
+
+
+class ConanLocalIndex():
+    """
+    In-memory index of all packages in the local conan cache.
+    Maps every ref to the minimal infos (settings, options, requires) of its packages,
+    so that local searches don't need to read the conaninfo files every time.
+    There is one instance per conan storage folder, shared between all ConanApi objects.
+    """
+    _instances: Dict[str, "ConanLocalIndex"] = {}
+    _instances_lock = Lock()
+
+    def __new__(cls, cache: ClientCache):
+        store_folder = str(cache.store)
+        with cls._instances_lock:
+            if store_folder not in cls._instances:
+                instance = super().__new__(cls)
+                instance._init_index(cache)
+                cls._instances[store_folder] = instance
+            return cls._instances[store_folder]
+
+    def _init_index(self, cache: ClientCache):
+        self._cache = cache
+        self._lock = Lock()
+        self._packages: Dict[str, "OrderedDict[str, Dict]"] = {}  # ref -> package id -> info
+        self._is_built = False
+
+    def build(self, max_workers: int = 8):
+        """ Read the infos of all packages in the cache with parallel file reads """
+        with self._lock:
+            if self._is_built:
+                return
+            refs = self._cache.all_refs()
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                ref_infos = executor.map(self._read_package_infos, refs)
+            self._packages = {str(ref): infos for ref, infos in zip(refs, ref_infos)}
+            self._is_built = True
+        Logger().debug(f"Indexed {len(refs)} refs of the local conan cache")
+
+    def update_ref(self, conan_ref: ConanFileReference):
+        """ Re-read the package infos of one ref, after it was installed or removed """
+        infos = self._read_package_infos(conan_ref)
+        with self._lock:
+            if infos:
+                self._packages[str(conan_ref)] = infos
+            else:
+                self._packages.pop(str(conan_ref), None)
+
+    def search_packages(self, conan_ref: ConanFileReference, query: Optional[str] = None) -> List["ConanPkg"]:
+        """ Find all packages of a ref in the local cache, which match the query (same syntax as conan search) """
+        self.build()
+        # listing the package folders is cheap compared to reading the infos - update only on difference
+        if self._get_package_ids(conan_ref) != set(self._packages.get(str(conan_ref), {}).keys()):
+            self.update_ref(conan_ref)
+        with self._lock:
+            infos = self._packages.get(str(conan_ref), OrderedDict())
+        try:
+            filtered_infos = filter_packages(query, infos)
+        except Exception as error:
+            Logger().debug(f"Can't search in local index: {str(error)}")
+            return []
+        return [{"id": package_id, "options": info.get("options", {}), "settings": info.get("settings", {}),
+                 "requires": info.get("full_requires", []), "outdated": False}
+                for package_id, info in filtered_infos.items()]
+
+    def _get_package_ids(self, conan_ref: ConanFileReference) -> Set[str]:
+        """ List the package folders of a ref """
+        try:
+            with os.scandir(self._cache.package_layout(conan_ref).packages()) as entries:
+                return {entry.name for entry in entries if entry.is_dir()}
+        except OSError:  # no package folder
+            return set()
+
+    def _read_package_infos(self, conan_ref: ConanFileReference) -> "OrderedDict[str, Dict]":
+        """ Read the conaninfo of every package of a ref """
+        infos: "OrderedDict[str, Dict]" = OrderedDict()
+        try:
+            packages_folder = self._cache.package_layout(conan_ref).packages()
+        except Exception:
+            return infos
+        for package_id in sorted(self._get_package_ids(conan_ref)):
+            try:
+                with open(os.path.join(packages_folder, package_id, CONANINFO)) as info_file:
+                    infos[package_id] = ConanInfo.loads(info_file.read()).serialize_min()
+            except Exception:  # no or invalid conaninfo - package is not usable
+                Logger().debug(f"Can't read {CONANINFO} of {str(conan_ref)}:{package_id}")
+        return infos
@@ -0,0 +1,118 @@
+import socket
+from threading import Event, Lock, Thread
+from typing import Callable, List, Optional
+from urllib.parse import urlparse
+
+from conan_app_launcher.base import Logger
+
+
+class ConanOfflineMode():
+    """
+    Singleton state of the offline mode, in which no remote is contacted and only the local cache is used.
+    It can be forced by the user and is turned on automatically, if no remote can be reached.
+    In the automatic mode the connection to the remotes is checked again in the background at a low rate.
+    """
+    _instance: Optional["ConanOfflineMode"] = None
+    _instance_lock = Lock()
+
+    RECHECK_INTERVAL_S = 60
+    CONNECT_TIMEOUT_S = 3
+
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                instance = super().__new__(cls)
+                instance._init_mode()
+                cls._instance = instance
+            return cls._instance
+
+    def _init_mode(self):
+        self._lock = Lock()
+        self._forced = False
+        self._auto = False
+        self._remote_urls: List[str] = []
+        self._recheck_stop = Event()
+        self._listeners: List[Callable[[bool], None]] = []
+
+    @property
+    def is_offline(self) -> bool:
+        return self._forced or self._auto
+
+    @property
+    def is_forced(self) -> bool:
+        return self._forced
+
+    def set_forced(self, forced: bool):
+        """ Turn the offline mode on or off by the user. This overrides the automatic mode. """
+        was_offline, was_forced = self.is_offline, self._forced
+        self._forced = forced
+        self._set_auto(False)
+        if was_offline != self.is_offline or was_forced != forced:
+            self._notify()
+
+    def add_listener(self, listener: Callable[[bool], None]):
+        """ Register a function, which is called with the new state on every change (from any thread) """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[bool], None]):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def report_connection_error(self, remote_urls: List[str]):
+        """ Turn on the offline mode after no remote could be reached and check the connection in the background """
+        with self._lock:
+            if self.is_offline:
+                return
+            self._auto = True
+            self._remote_urls = list(remote_urls)
+            self._recheck_stop = Event()
+            Thread(target=self._recheck_connection, args=(self._recheck_stop, ),
+                   name="ConanConnectionCheck", daemon=True).start()
+        Logger().warning("Can't connect to any remote - switching to offline mode.")
+        self._notify()
+
+    def stop(self):
+        """ Stop checking the connection in the background """
+        self._recheck_stop.set()
+
+    @classmethod
+    def check_connection(cls, remote_urls: List[str]) -> bool:
+        """ Check, that at least one of the remotes can be reached with a plain connection """
+        for url in remote_urls:
+            parsed_url = urlparse(url)
+            if not parsed_url.hostname:
+                continue
+            port = parsed_url.port or (443 if parsed_url.scheme == "https" else 80)
+            try:
+                socket.create_connection((parsed_url.hostname, port), cls.CONNECT_TIMEOUT_S).close()
+                return True
+            except OSError:
+                continue
+        return False
+
+    def _recheck_connection(self, stop: Event):
+        """ Switch back to online, when a remote is reachable again """
+        while not stop.wait(self.RECHECK_INTERVAL_S):
+            if self.check_connection(self._remote_urls):
+                if self._set_auto(False):
+                    Logger().info("Remotes are reachable again - switching to online mode.")
+                    self._notify()
+                return
+
+    def _set_auto(self, auto: bool) -> bool:
+        """ Set the automatic offline mode and return, if it changed """
+        with self._lock:
+            changed = self._auto != auto
+            self._auto = auto
+            if not auto:
+                self._recheck_stop.set()
+        return changed
+
+    def _notify(self):
+        with self._lock:
+            listeners = list(self._listeners)
+        is_offline = self.is_offline
+        for listener in listeners:
+            listener(is_offline)
@@ -0,0 +1,73 @@
+import sys
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+try:
+    from typing import TypedDict
+except ImportError:
+    from typing_extensions import TypedDict
+
+if TYPE_CHECKING:
+    from conan_app_launcher.components.conan import ConanPkg
+
+# criteria of the ranking - the default weights are powers of two, so that a criterion
+# always outweighs all criteria with lower weights combined
+NO_DEBUG = "no_debug"
+DEFAULT_OPTIONS = "default_options"
+COMPILER = "compiler"
+COMPILER_VERSION = "compiler_version"
+
+DEFAULT_RANKING_WEIGHTS: Dict[str, int] = {
+    NO_DEBUG: 8,
+    DEFAULT_OPTIONS: 4,
+    COMPILER: 2,
+    COMPILER_VERSION: 1,
+}
+
+
+class RankedPkg(TypedDict):
+    """ A package with its score and the fulfilled criteria leading to it """
+
+    score: int
+    package: "ConanPkg"
+    explanation: List[str]
+
+
+def rank_packages(packages: List["ConanPkg"], default_settings: Dict[str, str],
+                  default_options: Dict[str, Any], input_options: Dict[str, str] = {},
+                  weights: Optional[Dict[str, int]] = None) -> List[RankedPkg]:
+    """
+    Score every package in a single pass and return them ranked with the best match first.
+    Packages with the same score keep their original order.
+    Default options are only compared, if the package has this option. User input overrides default options.
+    """
+    if weights is None:
+        weights = DEFAULT_RANKING_WEIGHTS
+    # precompute the reference values once, interned strings are compared by identity first
+    compiler = sys.intern(str(default_settings.get("compiler", "")))
+    compiler_version = sys.intern(str(default_settings.get("compiler.version", "")))
+    merged_options = dict(default_options) if default_options else {}
+    merged_options.update(input_options)
+    option_items: Tuple[Tuple[str, str], ...] = tuple(
+        (sys.intern(str(name)), sys.intern(str(value))) for name, value in merged_options.items())
+
+    ranked_pkgs: List[RankedPkg] = []
+    for package in packages:
+        settings = package["settings"]
+        options = package["options"]
+        score = 0
+        explanation: List[str] = []
+        if settings.get("build_type", "").lower() != "debug":
+            score += weights.get(NO_DEBUG, 0)
+            explanation.append("no debug build")
+        if option_items and all(options.get(name, value) == value for name, value in option_items):
+            score += weights.get(DEFAULT_OPTIONS, 0)
+            explanation.append("default options")
+        if settings.get("compiler", "") == compiler:
+            score += weights.get(COMPILER, 0)
+            explanation.append(f"compiler {compiler}")
+            if settings.get("compiler.version", "") == compiler_version:
+                score += weights.get(COMPILER_VERSION, 0)
+                explanation.append(f"compiler version {compiler_version}")
+        ranked_pkgs.append({"score": score, "package": package, "explanation": explanation})
+    ranked_pkgs.sort(key=lambda ranked_pkg: ranked_pkg["score"], reverse=True)  # stable sort
+    return ranked_pkgs
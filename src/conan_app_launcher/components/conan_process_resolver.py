@@ -0,0 +1,99 @@
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Optional
+
+from conans.model.ref import ConanFileReference
+
+import conan_app_launcher as this
+from conan_app_launcher.base import Logger
+from conan_app_launcher.components.conan import ConanApi, ConanResolveResult, get_unresolved_result
+from conan_app_launcher.components.conan_api_pool import ConanApiPool
+from conan_app_launcher.components.conan_offline import ConanOfflineMode
+
+# ConanApi instance of a resolver process - lives as long as the process
+_process_conan: Optional[ConanApi] = None
+
+
+def _init_process(cache_path: Path):
+    """ Initializer of a resolver process. Global variables must be set up anew in a spawned process. """
+    global _process_conan
+    this.cache_path = cache_path
+    _process_conan = ConanApi()
+
+
+def _resolve_in_process(conan_ref: str, conan_options: Dict[str, str], forced: bool,
+                        offline: bool) -> ConanResolveResult:
+    """
+    Entry point for resolutions in the resolver process. The offline mode of the main process is applied.
+    A failed connection to the remotes is reported back in the result.
+    """
+    offline_mode = ConanOfflineMode()
+    if offline_mode.is_forced != forced:
+        offline_mode.set_forced(forced)
+    elif offline and not offline_mode.is_offline:  # turned on automatically in the main process
+        _process_conan.report_connection_error()
+    elif not offline and offline_mode.is_offline:  # the main process is online again
+        offline_mode.set_forced(False)
+    result = _process_conan.resolve_package(ConanFileReference.loads(conan_ref), conan_options)
+    result["connection_failed"] = offline_mode.is_offline and not offline
+    _process_conan.info_cache.flush()  # the process can be terminated at any time
+    return result
+
+
+class ConanProcessResolver():
+    """
+    Resolves packages with a ConanApi in a separate process, so conan doesn't compete with the GUI for the GIL.
+    Only the small result record is sent back. If conan crashes or hangs, only this process is restarted.
+    Provides the same interface for resolution as ConanApi.
+    The offline mode is synchronized with the resolver process in both directions.
+    """
+
+    # the executor can only start spawned processes with an initializer from python 3.7
+    IS_SUPPORTED = sys.version_info >= (3, 7)
+
+    def __init__(self, timeout_s: int = 1800):
+        self._timeout_s = timeout_s
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def get_path_or_install(self, conan_ref: ConanFileReference, input_options: Dict[str, str] = {}) -> Path:
+        """ Return the package folder of a conan reference and install it, if it is not available """
+        return Path(self.resolve_package(conan_ref, input_options)["folder"])
+
+    def resolve_package(self, conan_ref: ConanFileReference,
+                        input_options: Dict[str, str] = {}) -> ConanResolveResult:
+        """ Resolve the package in the resolver process, which is started on first use """
+        try:
+            if not self._executor:
+                # don't fork the Qt process with all of its threads
+                self._executor = ProcessPoolExecutor(max_workers=1,
+                                                     mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=_init_process, initargs=(this.cache_path,))
+            future = self._executor.submit(_resolve_in_process, str(conan_ref), input_options,
+                                           ConanOfflineMode().is_forced, ConanOfflineMode().is_offline)
+            result = future.result(self._timeout_s)
+            if result.get("connection_failed") and not ConanOfflineMode().is_offline:
+                with ConanApiPool().leased() as conan:  # for the remotes to check the connection again
+                    conan.report_connection_error()
+            return result
+        except TimeoutError:
+            Logger().error(f"Resolving '{str(conan_ref)}' timed out after {self._timeout_s}s.")
+            self.shutdown()
+        except BrokenProcessPool:
+            Logger().error(f"Resolver process crashed while resolving '{str(conan_ref)}'.")
+            self.shutdown()
+        except Exception as error:
+            Logger().error(f"Can't resolve '{str(conan_ref)}': {str(error)}")
+        return get_unresolved_result(conan_ref)
+
+    def shutdown(self):
+        """ Stop the resolver process, also if it hangs. A new one will be started on the next resolution. """
+        if not self._executor:
+            return
+        # there is no public api to kill the processes of the executor
+        for process in list((getattr(self._executor, "_processes", None) or {}).values()):
+            process.terminate()
+        self._executor.shutdown(wait=False)
+        self._executor = None
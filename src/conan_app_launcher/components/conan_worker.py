@@ -1,90 +1,394 @@
 
-from queue import Queue
-from threading import Thread
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from itertools import count
+from queue import PriorityQueue
+from threading import Lock, Thread, current_thread
 # this allows to use forward declarations to avoid circular imports
-from typing import TYPE_CHECKING, List
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Union
 
 from PyQt5 import QtCore
 from conans.model.ref import ConanFileReference
 
 from conan_app_launcher.base import Logger
 from conan_app_launcher.components.conan import ConanApi
+from conan_app_launcher.components.conan_api_pool import ConanApiPool
+from conan_app_launcher.components.conan_info_cache import ConanInfoCache
+from conan_app_launcher.components.conan_process_resolver import ConanProcessResolver
 
 if TYPE_CHECKING:
-    from conan_app_launcher.components import TabEntry
+    from conan_app_launcher.components import AppEntry, TabEntry
+
+# conan ref and sorted options of a resolution
+JobKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+# priorities of jobs - lower is resolved first
+PRIORITY_ACTIVE_TAB = 0
+PRIORITY_OTHER_TAB = 1
+PRIORITY_PREFETCH = 2  # requests without an app entry
+
+
+class ConanJob():
+    """ Resolution of a ref with options, which is shared by all app entries waiting for it """
+
+    def __init__(self, conan_ref: str, conan_options: Dict[str, str], order: int):
+        self.conan_ref = conan_ref
+        self.conan_options = conan_options
+        self.waiters: Set["AppEntry"] = set()
+        self.requested_without_entry = False  # can't be superseded
+        self.order = order  # of the request - kept on a change of priority
+        self.priority: Optional[int] = None  # of the latest queue entry
+        self.started = False
+
+    @staticmethod
+    def get_key(conan_ref: str, conan_options: Dict[str, str]) -> JobKey:
+        return str(conan_ref), tuple(sorted((str(name), str(value)) for name, value in conan_options.items()))
 
 
 class ConanWorker():
-    """ Sequential worker with a queue to execute conan commands and get info on packages """
+    """ Worker with a prioritized queue and a thread pool to run conan commands and get info on packages """
 
-    def __init__(self, tabs: List["TabEntry"], gui_update_signal: QtCore.pyqtSignal):
-        self._conan = ConanApi()
-        self._conan_queue: "Queue[Tuple[str, Dict[str, str]]]" = Queue(maxsize=0)
-        self._version_getter = None
-        self._worker = None
+    def __init__(self, tabs: List["TabEntry"], gui_update_signal: QtCore.pyqtSignal, worker_num: int = 4,
+                 use_processes: bool = False, recipes_cache_ttl_s: int = 3600, active_tab: int = 0):
+        self._conan_queue: "PriorityQueue[Tuple[int, int, JobKey]]" = PriorityQueue(maxsize=0)
+        self._request_order = count()  # keeps the order of requests with the same priority
+        self._jobs: Dict[JobKey, ConanJob] = {}  # queued and running
+        self._app_requests: Dict["AppEntry", JobKey] = {}  # latest request of every app entry
+        self._app_tabs: Dict["AppEntry", int] = {}  # tab index of every app entry
+        self._package_folders: Dict[JobKey, Path] = {}  # results for app entries, which are created later
+        self._available_refs: Dict[str, List[ConanFileReference]] = {}  # by search pattern
+        self._active_tab = active_tab
+        self._worker_num = max(1, worker_num)
+        self._version_getter = ThreadPoolExecutor(max_workers=self._worker_num,
+                                                  thread_name_prefix="ConanVersionGetter")
+        self._version_futures: List[Future] = []
+        if use_processes and not ConanProcessResolver.IS_SUPPORTED:
+            Logger().warning("Resolver processes need Python 3.7 or newer - resolving in the application.")
+            use_processes = False
+        self._use_processes = use_processes
+        self._resolvers: List[ConanProcessResolver] = []  # idle resolver processes
+        self._recipes_cache_ttl_s = recipes_cache_ttl_s
+        self._workers: List[Thread] = []
+        self._workers_lock = Lock()
         self._closing = False
         self._gui_update_signal = gui_update_signal
         self._tabs = tabs
+        # the first ConanApi initializes the conan home, hooks and plugins in the background,
+        # so that the gui is not blocked - all others wait for it
+        self._conan_init = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ConanInit")
+        self._conan_ready: "Future[bool]" = self._conan_init.submit(self._init_conan)
 
-        # get all conan refs and  make them unique # TODO separate this from worker
-        conan_refs = []
-        for tab in tabs:
+        # fill up queue - identical refs and options are merged
+        # the apps of not yet loaded tabs are resolved from their records and get the results on creation
+        search_patterns: Dict[str, str] = {}  # pattern -> first ref with this pattern
+        for tab_index, tab in enumerate(tabs):
+            if not tab.is_loaded:  # resolve the records without creating the entries
+                for app_record in tab.get_app_records():
+                    conan_ref = app_record.get_conan_ref()
+                    if conan_ref is None:
+                        continue
+                    self._add_job(str(conan_ref), app_record.get_conan_options(), None)
+                    search_patterns.setdefault(ConanApi.get_recipes_search_pattern(conan_ref), str(conan_ref))
+                continue
             for app in tab.get_app_entries():
-                ref_dict = {"name": str(app.conan_ref), "options": app.conan_options}
-                if not ref_dict in conan_refs:
-                    conan_refs.append(ref_dict)
-
-        # fill up queue
-        for ref in conan_refs:
-            self._conan_queue.put([ref["name"], ref["options"]])
-            # start getting versions info in a separate thread
-            self._version_getter = Thread(target=self._get_packages_versions, args=[ref["name"], ])
-            self._version_getter.start()
+                self._app_tabs[app] = tab_index
+                self._add_job(str(app.conan_ref), app.conan_options, app)
+                search_patterns.setdefault(ConanApi.get_recipes_search_pattern(app.conan_ref), str(app.conan_ref))
+        # get versions info in the background - refs with the same pattern share one search
+        for conan_ref in search_patterns.values():
+            self._version_futures.append(self._version_getter.submit(self._get_packages_versions, conan_ref))
+        self.start_working()
+
+    def put_ref_in_queue(self, conan_ref: str, conan_options: Dict[str, str], app: Optional["AppEntry"] = None):
+        """
+        Request the resolution of a ref with options. If an app entry is given,
+        its earlier request is superseded and it gets the result.
+        """
+        self._add_job(conan_ref, conan_options, app)
         self.start_working()
 
-    def put_ref_in_queue(self, conan_ref: str, conan_options: {}):
-        self._conan_queue.put([conan_ref, conan_options])
+    def _add_job(self, conan_ref: str, conan_options: Dict[str, str], app: Optional["AppEntry"]):
+        """ Queue a new job or merge the request into a queued or running one with the same ref and options """
+        job_key = ConanJob.get_key(conan_ref, conan_options)
+        with self._workers_lock:
+            if app is not None:
+                previous_job = self._jobs.get(self._app_requests.get(app))
+                if previous_job:
+                    previous_job.waiters.discard(app)
+                self._app_requests[app] = job_key
+            job = self._jobs.get(job_key)
+            if job is None:
+                job = self._jobs[job_key] = ConanJob(conan_ref, conan_options, next(self._request_order))
+            if app is None:
+                job.requested_without_entry = True
+            else:
+                job.waiters.add(app)
+            self._queue_job(job_key, job)
+
+    def update_app_entries(self, added_apps: List["AppEntry"], removed_apps: List["AppEntry"]):
+        """
+        Apply changed app entries of the tabs: the requests of removed entries are dropped,
+        added entries without a package are resolved and their versions are searched.
+        Results, which are already known, e.g. of a tab loaded later, are set immediately.
+        """
+        if self._closing:
+            return
+        with self._workers_lock:
+            for app in removed_apps:
+                job = self._jobs.get(self._app_requests.pop(app, None))
+                if job:
+                    job.waiters.discard(app)
+            self._app_tabs = {app: tab_index for tab_index, tab in enumerate(self._tabs)
+                              for app in tab.get_loaded_app_entries()}
+            package_folders = dict(self._package_folders)
+            available_refs = dict(self._available_refs)
+        search_patterns: Dict[str, str] = {}
+        for app in added_apps:
+            search_pattern = ConanApi.get_recipes_search_pattern(app.conan_ref)
+            package_folder = package_folders.get(ConanJob.get_key(str(app.conan_ref), app.conan_options))
+            if package_folder is not None and not app.package_folder.is_dir() and package_folder.is_dir():
+                app.set_package_info(package_folder)
+            if search_pattern in available_refs:
+                app.set_available_packages(available_refs[search_pattern])
+            if not app.package_folder.is_dir():
+                self._add_job(str(app.conan_ref), app.conan_options, app)
+            if search_pattern not in available_refs:
+                search_patterns.setdefault(search_pattern, str(app.conan_ref))
+        for conan_ref in search_patterns.values():
+            self._version_futures.append(self._version_getter.submit(self._get_packages_versions, conan_ref))
         self.start_working()
 
+    def set_active_tab(self, tab_index: int):
+        """ Resolve the apps of this tab first - can be called from the gui on every tab change """
+        with self._workers_lock:
+            self._active_tab = tab_index
+            for job_key, job in self._jobs.items():
+                self._queue_job(job_key, job)
+
+    def _queue_job(self, job_key: JobKey, job: ConanJob):
+        """
+        Queue a not yet started job, if it is new or its priority changed - the outdated queue entry is skipped.
+        Must be called with the lock.
+        """
+        if job.started:
+            return
+        priorities = [self._get_priority(app) for app in job.waiters]
+        if job.requested_without_entry:
+            priorities.append(PRIORITY_PREFETCH)
+        if not priorities:  # superseded - will be dropped
+            return
+        priority = min(priorities)
+        if priority != job.priority:
+            job.priority = priority
+            self._conan_queue.put((priority, job.order, job_key))
+
+    def _get_priority(self, app: "AppEntry") -> int:
+        """
+        Priority by the tab of the app entry: the active tab first, then the other tabs,
+        then requests without an app. Must be called with the lock.
+        """
+        tab_index = self._app_tabs.get(app)
+        if tab_index is None:  # added after the start
+            for index, tab in enumerate(self._tabs):
+                if app in tab.get_loaded_app_entries():
+                    tab_index = self._app_tabs[app] = index
+                    break
+            else:
+                return PRIORITY_PREFETCH
+        return PRIORITY_ACTIVE_TAB if tab_index == self._active_tab else PRIORITY_OTHER_TAB
+
     def start_working(self):
-        """ Start worker, if it is not already started (can be called multiple times)"""
-        if not self._worker or not self._worker.is_alive():
-            self._worker = Thread(target=self._work_on_conan_queue, name="ConanWorker")
-            self._worker.start()
+        """ Start workers up to the pool size, if they are not already started (can be called multiple times)"""
+        with self._workers_lock:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            missing_workers = min(self._worker_num - len(self._workers), self._conan_queue.qsize())
+            for _ in range(missing_workers):
+                worker = Thread(target=self._work_on_conan_queue, name="ConanWorker")
+                self._workers.append(worker)
+                worker.start()
 
     def finish_working(self, timeout_s: int = None):
         """ Cancel, if worker is still not finished """
         self._closing = True
-        if self._worker and self._worker.is_alive():
-            self._worker.join(timeout_s)
-        if self._version_getter and self._version_getter.is_alive():
-            self._version_getter.join(timeout_s)
-        self._conan_queue = Queue(maxsize=0)
-        self._worker = None  # reset thread for later instantiation
+        with self._workers_lock:
+            workers = list(self._workers)
+        for worker in workers:
+            if worker.is_alive():
+                worker.join(timeout_s)
+        for future in self._version_futures:
+            future.cancel()  # only possible for not yet started searches
+        wait(self._version_futures, timeout_s)
+        self._version_getter.shutdown(wait=False)
+        self._conan_init.shutdown(wait=False)
+        self._version_futures = []
+        ConanInfoCache.flush_all()
+        with self._workers_lock:
+            resolvers, self._resolvers = self._resolvers, []
+        for resolver in resolvers:
+            resolver.shutdown()
+        with self._workers_lock:
+            self._conan_queue = PriorityQueue(maxsize=0)
+            self._jobs = {}
+            self._app_requests = {}
+            self._app_tabs = {}
+            self._package_folders = {}
+            self._available_refs = {}
+            self._workers = []  # reset threads for later instantiation
+
+    def wait_for_conan(self, timeout_s: Optional[float] = None) -> bool:
+        """ Block until conan is initialized in the background. Returns, if the initialization succeeded. """
+        try:
+            return self._conan_ready.result(timeout_s)
+        except Exception:  # timeout or cancelled
+            return False
+
+    def _init_conan(self) -> bool:
+        """ Initialize conan into the pool and warm up the shared local index and profile snapshot """
+        try:
+            with ConanApiPool().leased() as conan:
+                conan.profile_snapshot.update()
+                conan.local_index.build()
+        except Exception as error:
+            Logger().error(f"Can't initialize conan: {str(error)}")
+            return False
+        Logger().debug("Conan is initialized")
+        return True
 
     def _work_on_conan_queue(self):
-        """ Call conan operations from queue """
-        while not self._closing and not self._conan_queue.empty():
-            conan_ref, conan_options = self._conan_queue.get()
-            package_folder = self._conan.get_path_or_install(
-                ConanFileReference.loads(conan_ref), conan_options)
-            # call update on every entry which has this ref
-            for tab in self._tabs:
-                for app in tab.get_app_entries():
-                    if str(app.conan_ref) == conan_ref:
-                        app.set_package_info(package_folder)
-            Logger().debug("Finish working on " + conan_ref)
-            if self._gui_update_signal:
-                self._gui_update_signal.emit()
-            self._conan_queue.task_done()
-
-    def _get_packages_versions(self, conan_ref):
-        available_refs = self._conan.search_for_all_recipes(ConanFileReference.loads(conan_ref))
-        if not available_refs:
+        """ Call conan operations from queue - each worker thread uses its own ConanApi or resolver process """
+        try:
+            self._conan_ready.result()
+            if self._use_processes:
+                resolver = self._lease_resolver()
+                try:
+                    while self._process_queue(resolver):
+                        pass
+                finally:
+                    self._release_resolver(resolver)
+            else:
+                self._process_queue_with_pool()
+        except Exception as error:
+            Logger().error(f"Conan worker stopped: {str(error)}")
+        finally:  # a new worker can be started for the remaining requests
+            with self._workers_lock:
+                if current_thread() in self._workers:
+                    self._workers.remove(current_thread())
+
+    def _process_queue_with_pool(self):
+        """ Work on the queue with a pooled ConanApi, which is reinitialized after a failed job """
+        pool = ConanApiPool()
+        job_failed = True
+        while job_failed:
+            conan = pool.lease()
+            try:
+                job_failed = self._process_queue(conan)
+            finally:
+                pool.release(conan, broken=job_failed)
+
+    def _lease_resolver(self) -> ConanProcessResolver:
+        """ Get an idle resolver process or a new one, which runs the conan operations of one worker thread """
+        with self._workers_lock:
+            if self._resolvers:
+                return self._resolvers.pop()
+        return ConanProcessResolver()
+
+    def _release_resolver(self, resolver: ConanProcessResolver):
+        """ Keep the resolver process for the next jobs - it is stopped, if the worker is already finishing """
+        with self._workers_lock:
+            if not self._closing:
+                self._resolvers.append(resolver)
+                return
+        resolver.shutdown()
+
+    def _process_queue(self, conan: Union[ConanApi, ConanProcessResolver]) -> bool:
+        """ Work on the queue until it is empty. Returns True, if it stopped early because of a failed job. """
+        while True:
+            # the check for an empty queue and the deregistration of the worker must be atomic,
+            # otherwise start_working could miss a new entry
+            with self._workers_lock:
+                if self._closing or self._conan_queue.empty():
+                    if current_thread() in self._workers:
+                        self._workers.remove(current_thread())
+                    return False
+                priority, _, job_key = self._conan_queue.get()
+                job = self._jobs.get(job_key)
+                if job is None or job.started or priority != job.priority:  # outdated queue entry
+                    self._conan_queue.task_done()
+                    continue
+                if not job.waiters and not job.requested_without_entry:
+                    del self._jobs[job_key]
+                    self._conan_queue.task_done()
+                    Logger().debug(f"Dropping superseded request for {job.conan_ref}")
+                    continue
+                job.started = True
+            try:
+                self._process_job(conan, job_key, job)
+            except Exception as error:
+                Logger().error(f"Can't resolve {job.conan_ref}: {str(error)}")
+                return True
+            finally:
+                with self._workers_lock:
+                    if self._jobs.get(job_key) is job:  # failed - can be requested again
+                        self._remove_job(job_key, job)
+                self._conan_queue.task_done()
+
+    def _process_job(self, conan: Union[ConanApi, ConanProcessResolver], job_key: JobKey, job: ConanJob):
+        """ Resolve the ref of a started job and set the result on all entries with its ref and options """
+        package_folder = conan.get_path_or_install(ConanFileReference.loads(job.conan_ref), job.conan_options)
+        with self._workers_lock:
+            self._remove_job(job_key, job)
+            self._package_folders[job_key] = package_folder
+            waiters = set(job.waiters)
+        # share the result with every entry, which has this ref and options
+        for tab in self._tabs:
+            for app in tab.get_loaded_app_entries():
+                if ConanJob.get_key(str(app.conan_ref), app.conan_options) == job_key:
+                    waiters.add(app)
+        for app in waiters:
+            app.set_package_info(package_folder)
+        Logger().debug("Finish working on " + job.conan_ref)
+        if self._gui_update_signal:
+            self._gui_update_signal.emit(job.conan_ref)
+
+    def _remove_job(self, job_key: JobKey, job: ConanJob):
+        """ Remove a finished job and the requests of its app entries. Must be called with the lock. """
+        self._jobs.pop(job_key, None)
+        for app in job.waiters:
+            if self._app_requests.get(app) == job_key:
+                del self._app_requests[app]
+
+    def _get_packages_versions(self, conan_ref: str):
+        """
+        Get all available versions of a ref and set them on all refs with the same search pattern.
+        Cached results are set immediately and searched again in the remotes,
+        if they are older than the configured time to live.
+        """
+        if self._closing:
             return
+        self._conan_ready.result()
+        with ConanApiPool().leased() as conan:
+            cached_refs, cache_age = conan.get_cached_recipes(ConanFileReference.loads(conan_ref))
+            if cached_refs:
+                self._set_available_packages(conan_ref, cached_refs)
+                if cache_age < self._recipes_cache_ttl_s:
+                    return
+            available_refs = conan.search_for_all_recipes(ConanFileReference.loads(conan_ref))
+        # only update the gui, if something changed
+        if not available_refs or available_refs == cached_refs:
+            return
+        self._set_available_packages(conan_ref, available_refs)
+
+    def _set_available_packages(self, conan_ref: str, available_refs: List[ConanFileReference]):
+        """ Set the available refs on every entry which has the search pattern of this ref and update the gui """
+        search_pattern = ConanApi.get_recipes_search_pattern(ConanFileReference.loads(conan_ref))
+        with self._workers_lock:
+            self._available_refs[search_pattern] = available_refs
+        updated_refs: Set[str] = set()
         for tab in self._tabs:
-            for app in tab.get_app_entries():
-                if not self._closing and str(app.conan_ref) == conan_ref:
+            for app in tab.get_loaded_app_entries():
+                if not self._closing and ConanApi.get_recipes_search_pattern(app.conan_ref) == search_pattern:
                     app.set_available_packages(available_refs)
+                    updated_refs.add(str(app.conan_ref))
         if not self._closing and self._gui_update_signal:
-            self._gui_update_signal.emit()
+            for updated_ref in updated_refs:
+                self._gui_update_signal.emit(updated_ref)
@@ -1,10 +1,13 @@
+import hashlib
 import json
+import os
 import platform
 import jsonschema
+import shutil
 import tempfile
 
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Set, Tuple
 from conans.model.ref import ConanFileReference
 
 try:
@@ -14,6 +17,7 @@ except ImportError:
 
 import conan_app_launcher as this
 from conan_app_launcher.base import Logger
+from conan_app_launcher.components.config_snapshot import ConfigSnapshot
 from conan_app_launcher.components.icon import extract_icon
 
 # TODO: remove json validation, when user edit will be removed.
@@ -22,6 +26,12 @@ from conan_app_launcher.components.icon import extract_icon
 # Write out package folder for caching?
 # Create setters with validation for everything.
 
+# the schema is loaded and compiled into a validator only once
+_config_validator: Optional[Any] = None
+_latest_config_version = ""
+# hashes of config file contents, which passed the validation
+_validated_hashes: Set[str] = set()
+
 
 class OptionType(TypedDict):
     name: str
@@ -52,12 +62,39 @@ class AppEntry():
     """ Representation of an app entry of the config schema """
     INVALID_DESCR = "NA"
     INVALID_REF = "Invalid/NA@NA/NA"
+    __slots__ = ("app_data", "dirty", "package_folder", "_config_file_path", "_conan_ref", "_conan_options",
+                 "_executable", "_icon", "_available_refs")
 
     def __init__(self, app_data: AppType = None, config_file_path: Path = None):
         if app_data is None:
             app_data = {"name": "", "conan_ref": self.INVALID_REF, "executable": "", "icon": "",
                         "console_application": False, "args": "", "conan_options": []}
+        self._init_data(app_data, config_file_path)
+
+        # Init values with validation, which can be preloaded
+        self.icon = self.app_data.get("icon", "")
+        self.conan_options = self.app_data.get("conan_options", [])
+        self.conan_ref = app_data.get("conan_ref", "")
+
+        self._available_refs: List[str] = [self.conan_ref]
+
+    @classmethod
+    def from_snapshot(cls, app_data: AppType, config_file_path: Path, conan_ref: str, icon: Path) -> "AppEntry":
+        """
+        Restore an entry of a config snapshot without validation and checks on the filesystem.
+        The paths are validated, when the package info is set.
+        """
+        app_entry = cls.__new__(cls)
+        app_entry._init_data(app_data, config_file_path)
+        app_entry._icon = icon
+        app_entry.conan_options = app_data.get("conan_options", [])
+        app_entry._conan_ref = ConanFileReference.loads(conan_ref, validate=False)
+        app_entry._available_refs = [app_entry._conan_ref]
+        return app_entry
+
+    def _init_data(self, app_data: AppType, config_file_path: Optional[Path]):
         self.app_data: AppType = app_data
+        self.dirty = False  # app_data changed since the last write
         self._config_file_path = config_file_path  # TODO will be removed later, when no relative icon paths allowed
         self.package_folder = Path("NULL")
         # internal repr for vars which have other types or need to be manipulated
@@ -66,20 +103,13 @@ class AppEntry():
         self._executable = Path("NULL")
         self._icon = Path("NULL")
 
-        # Init values with validation, which can be preloaded
-        self.icon = self.app_data.get("icon", "")
-        self.conan_options = self.app_data.get("conan_options", [])
-        self.conan_ref = app_data.get("conan_ref", "")
-
-        self._available_refs: List[str] = [self.conan_ref]
-
     @property
     def name(self):
         return self.app_data["name"]
 
     @name.setter
     def name(self, new_value: str):
-        self.app_data["name"] = new_value
+        self._set_app_data("name", new_value)
 
     @property
     def conan_ref(self) -> ConanFileReference:
@@ -94,8 +124,8 @@ class AppEntry():
             if (self.app_data["conan_ref"] != new_value and new_value != self.INVALID_REF
                     and self._conan_ref.version != self.INVALID_DESCR
                     and self._conan_ref.channel != self.INVALID_DESCR):  # don't put it for init
-                this.conan_worker.put_ref_in_queue(str(self._conan_ref), self.conan_options)
-            self.app_data["conan_ref"] = new_value
+                this.conan_worker.put_ref_in_queue(str(self._conan_ref), self.conan_options, self)
+            self._set_app_data("conan_ref", new_value)
         except Exception as error:
             # errors happen fairly often, keep going
             self._conan_ref = ConanFileReference.loads(self.INVALID_REF)
@@ -132,6 +162,10 @@ class AppEntry():
                 channels.append(ref.channel)
         return list(set(channels))
 
+    @property
+    def available_refs(self) -> List[ConanFileReference]:
+        return self._available_refs
+
     @property
     def executable(self):
         return self._executable
@@ -151,7 +185,7 @@ class AppEntry():
         if self.package_folder.is_dir() and not full_path.is_file():
             Logger().error(
                 f"Can't find file in package {str(self.conan_ref)}:\n    {str(full_path)}")
-        self.app_data["executable"] = new_value
+        self._set_app_data("executable", new_value)
         self._executable = full_path
 
     @property
@@ -178,7 +212,7 @@ class AppEntry():
                 Logger().error(f"Can't find icon {str(new_value)} for '{self.name}")
         else:
             self._icon = self._icon.resolve()
-            self.app_data["icon"] = new_value
+            self._set_app_data("icon", new_value)
 
     @property
     def is_console_application(self) -> bool:
@@ -186,7 +220,7 @@ class AppEntry():
 
     @is_console_application.setter
     def is_console_application(self, new_value):
-        self.app_data["console_application"] = new_value
+        self._set_app_data("console_application", new_value)
 
     @property
     def args(self):
@@ -194,7 +228,7 @@ class AppEntry():
 
     @args.setter
     def args(self, new_value):
-        self.app_data["args"] = new_value
+        self._set_app_data("args", new_value)
 
     @property
     def conan_options(self) -> Dict[str, str]:  # user specified, can differ from the actual installation
@@ -207,7 +241,13 @@ class AppEntry():
         for opt in new_value:
             conan_options[opt.get("name", "")] = opt.get("value", "")
         self._conan_options = conan_options
-        self.app_data["conan_options"] = new_value
+        self._set_app_data("conan_options", new_value)
+
+    def _set_app_data(self, key: str, new_value: Any):
+        """ Set a value of the config and mark the entry dirty, if it changed """
+        if self.app_data.get(key) != new_value:
+            self.app_data[key] = new_value
+            self.dirty = True
 
     def set_package_info(self, package_folder: Path):
         """ Callback when conan operation is done and paths can be validated"""
@@ -222,23 +262,114 @@ class AppEntry():
         self._available_refs = available_refs
 
 
+class AppRecord():
+    """
+    Raw data of an app of the config file, which is turned into an AppEntry, when it is needed.
+    The ref and icon are only set, if they were already validated, e.g. in a snapshot.
+    """
+    __slots__ = ("app_data", "conan_ref", "icon")
+
+    def __init__(self, app_data: AppType, conan_ref: Optional[str] = None, icon: Optional[str] = None):
+        self.app_data = app_data
+        self.conan_ref = conan_ref
+        self.icon = icon
+
+    def get_conan_ref(self) -> Optional[ConanFileReference]:
+        """ Parse the ref without creating the entry - None, if it is invalid """
+        try:
+            return ConanFileReference.loads(self.conan_ref or self.app_data.get("conan_ref", ""),
+                                            validate=self.conan_ref is None)
+        except Exception:
+            return None
+
+    def get_conan_options(self) -> Dict[str, str]:
+        return {opt.get("name", ""): opt.get("value", "") for opt in self.app_data.get("conan_options", [])}
+
+    def materialize(self, config_file_path: Optional[Path]) -> AppEntry:
+        if self.conan_ref is None or self.icon is None:
+            return AppEntry(self.app_data, config_file_path)
+        return AppEntry.from_snapshot(self.app_data, config_file_path, self.conan_ref, Path(self.icon))
+
+    def validate(self, config_file_path: Optional[Path]) -> "AppRecord":
+        """ Get a record with the validated ref and icon, so that it can be restored without validation """
+        if self.conan_ref is not None and self.icon is not None:
+            return self
+        app_entry = AppEntry(dict(self.app_data), config_file_path)
+        return AppRecord(self.app_data, str(app_entry.conan_ref), str(app_entry.icon))
+
+
 class TabEntry():
-    """ Representation of a tab entry of the config schema """
+    """
+    Representation of a tab entry of the config schema.
+    The apps are kept as raw records and turned into AppEntry objects on first access.
+    """
 
-    def __init__(self, name):
+    def __init__(self, name, config_file_path: Optional[Path] = None):
         self.name = name
-        self._app_entries: List[AppEntry] = []
+        self.dirty = False  # apps were added or removed since the last write
+        self._config_file_path = config_file_path
+        self._app_records: List[AppRecord] = []
+        self._app_entries: Optional[List[AppEntry]] = None  # None, until the records are loaded
         Logger().debug(f"Adding tab {name}")
 
+    @property
+    def is_loaded(self) -> bool:
+        """ The app entries were created - can be checked without creating them """
+        return self._app_entries is not None
+
+    def add_app_record(self, app_record: AppRecord):
+        """ Add the raw data of an app, which is loaded with the other records on first access """
+        if self.is_loaded:
+            self._app_entries.append(app_record.materialize(self._config_file_path))
+        else:
+            self._app_records.append(app_record)
+
+    def get_app_records(self) -> List[AppRecord]:
+        """ Get the raw data of all apps without loading them """
+        if not self.is_loaded:
+            return self._app_records
+        return [AppRecord(app_entry.app_data, str(app_entry.conan_ref), str(app_entry.icon))
+                for app_entry in self._app_entries]
+
+    def set_app_records(self, app_records: List[AppRecord]):
+        """ Replace all apps with raw data, which is loaded on the next access """
+        self._app_records = list(app_records)
+        self._app_entries = None
+
     def add_app_entry(self, app_entry: AppEntry):
         """ Add an AppConfigEntry object to the tabs layout """
-        self._app_entries.append(app_entry)
+        self.get_app_entries().append(app_entry)
+        self.dirty = True
 
     def remove_app_entry(self, app_entry: AppEntry):
-        self._app_entries.remove(app_entry)
+        self.get_app_entries().remove(app_entry)
+        self.dirty = True
+
+    def set_app_entries(self, app_entries: List[AppEntry]):
+        """ Replace all app entries - the list is exchanged, so that readers in other threads are safe """
+        self._app_entries = list(app_entries)
+        self._app_records = []
+        self.dirty = True
 
     def get_app_entries(self) -> List[AppEntry]:
-        """ Get all app entries on the tab layout """
+        """ Get all app entries on the tab layout - they are created on first access """
+        if self._app_entries is None:
+            # assign at once, so that other threads see all or none of them
+            self._app_entries = [app_record.materialize(self._config_file_path)
+                                 for app_record in self._app_records]
+            self._app_records = []
+        return self._app_entries
+
+    def get_app_data(self) -> List[AppType]:
+        """ Get the data of all apps without loading them """
+        if self._app_entries is None:
+            return [app_record.app_data for app_record in self._app_records]
+        return [app_entry.app_data for app_entry in self._app_entries]
+
+    def get_loaded_app_entries(self) -> List[AppEntry]:
+        """ Get the app entries, which were already created """
+        if self._app_entries is None:
+            return []
         return self._app_entries
 
     def get_app_entry(self, name: str) -> Optional[AppEntry]:
@@ -250,64 +381,231 @@ class TabEntry():
         return app
 
 
-def update_app_info(app: dict):
+def merge_app_entries(current_apps: List[AppEntry],
+                      new_apps: List[AppEntry]) -> Tuple[List[AppEntry], List[AppEntry], List[AppEntry]]:
+    """
+    Merge the reloaded apps of a tab into the current ones. Apps are matched by name.
+    Unchanged apps are kept. Changed apps are replaced and take over the package info, if the ref is the same.
+    Returns the merged apps in the new order, the added or changed and the removed or replaced apps.
+    """
+    current_by_name: Dict[str, List[AppEntry]] = {}
+    for current_app in current_apps:
+        current_by_name.setdefault(current_app.name, []).append(current_app)
+    merged: List[AppEntry] = []
+    added: List[AppEntry] = []
+    removed: List[AppEntry] = []
+    for new_app in new_apps:
+        same_name_apps = current_by_name.get(new_app.name)
+        current_app = same_name_apps.pop(0) if same_name_apps else None
+        if current_app and current_app.app_data == new_app.app_data:
+            merged.append(current_app)
+            continue
+        if current_app:
+            removed.append(current_app)
+            if (current_app.conan_ref == new_app.conan_ref
+                    and current_app.conan_options == new_app.conan_options):
+                new_app.set_available_packages(current_app.available_refs)
+                if current_app.package_folder.is_dir():
+                    new_app.set_package_info(current_app.package_folder)
+        merged.append(new_app)
+        added.append(new_app)
+    for same_name_apps in current_by_name.values():
+        removed.extend(same_name_apps)
+    return merged, added, removed
+
+
+def update_app_info(app: dict) -> bool:
+    """ Migrate the data of an app to the latest version. Returns, if something changed. """
+    changed = False
     # change from 0.2.0 to 0.3.0
     if app.get("package_id"):
         value = app.pop("package_id")
         app["conan_ref"] = value
+        changed = True
+    return changed
 
 
-def parse_config_file(config_file_path: Path) -> List[TabEntry]:
-    """ Parse the json config file, validate and convert to object structure """
+def parse_config_file(config_file_path: Path, read_only: bool = False) -> List[TabEntry]:
+    """
+    Parse the json config file, validate and convert to object structure.
+    A migrated config is written back, if it is not read only.
+    """
     app_config = None
     Logger().info(f"Loading file '{config_file_path}'...")
 
     if not config_file_path.is_file():
         Logger().error(f"Config file '{config_file_path}' does not exist.")
         return []
-    with open(str(config_file_path)) as fp:
-        try:
-            app_config = json.load(fp)
-            with open(this.base_path / "assets" / "config_schema.json") as schema_file:
-                json_schema = json.load(schema_file)
-                jsonschema.validate(instance=app_config, schema=json_schema)
-        except BaseException as error:
-            Logger().error(f"Config file:\n{str(error)}")
-            return []
+    try:
+        content = config_file_path.read_bytes()
+        content_hash = _get_content_hash(content)
+        # an unchanged file is restored from the snapshot of the last load
+        tabs = _load_snapshot(config_file_path, content_hash)
+        if tabs is not None:
+            return tabs
+        app_config = json.loads(content)
+        # an unchanged file doesn't need to be validated again
+        if content_hash not in _validated_hashes:
+            _validate_config(app_config)
+            _validated_hashes.add(content_hash)
+    except BaseException as error:
+        Logger().error(f"Config file:\n{str(error)}")
+        return []
 
     # build the object model and update
+    migrated = False
     tabs = []
     for tab in app_config.get("tabs"):
-        tab_entry = TabEntry(tab.get("name"))
+        tab_entry = TabEntry(tab.get("name"), config_file_path)
         for app in tab.get("apps"):
             # TODO: not very robust, but enough for small changes
-            update_app_info(app)
-            app_entry = AppEntry(app, config_file_path)
-            tab_entry.add_app_entry(app_entry)
+            if update_app_info(app):
+                migrated = True
+            tab_entry.add_app_record(AppRecord(app))
         tabs.append(tab_entry)
+    mark_config_written(tabs)
     # auto Update version to next version:
-    app_config["version"] = json_schema.get("properties").get("version").get("enum")[-1]
+    if app_config.get("version") != get_latest_config_version():
+        app_config["version"] = get_latest_config_version()
+        migrated = True
     # write it back with updates
-    with open(str(config_file_path), "w") as config_file:
-        json.dump(app_config, config_file, indent=4)
+    if migrated:
+        if is_config_read_only(config_file_path, read_only):
+            return tabs  # no snapshot, so that it is migrated, when it can be written
+        content = json.dumps(app_config, indent=4)
+        try:
+            write_file_atomic(config_file_path, content)
+        except Exception as error:
+            Logger().error(f"Can't write migrated config file '{config_file_path}': {str(error)}")
+            return tabs
+        Logger().info(f"Migrated config file '{config_file_path}' to version {app_config['version']}")
+        mark_config_content_valid(content)
+        content_hash = _get_content_hash(content.encode("utf-8"))
+    _save_snapshot(config_file_path, content_hash, tabs)
+    return tabs
+
+
+def is_config_read_only(config_file_path: Path, read_only: bool = False) -> bool:
+    """ A config is read only, if it is set to be or the user can't write it """
+    return read_only or not os.access(str(config_file_path), os.W_OK)
+
+
+def _load_snapshot(config_file_path: Path, content_hash: str) -> Optional[List[TabEntry]]:
+    """ Restore the model from the snapshot, if it is valid for the current file """
+    model = ConfigSnapshot(config_file_path).load(content_hash)
+    if model is None:
+        return None
+    tabs = []
+    for tab_name, apps in model:
+        tab_entry = TabEntry(tab_name, config_file_path)
+        for app_data, conan_ref, icon in apps:
+            tab_entry.add_app_record(AppRecord(app_data, conan_ref, icon))
+        tabs.append(tab_entry)
+    mark_config_written(tabs)
+    Logger().debug(f"Restored '{config_file_path}' from snapshot")
     return tabs
 
 
+def save_config_snapshot(config_file_path: Path, content: str, tab_entries: List[TabEntry]):
+    """ Save the model for the written content of the config file, so that it can be restored quickly """
+    _save_snapshot(config_file_path, _get_content_hash(content.encode("utf-8")), tab_entries)
+
+
+def _save_snapshot(config_file_path: Path, content_hash: str, tab_entries: List[TabEntry]):
+    model = []
+    for tab in tab_entries:
+        app_records = [app_record.validate(config_file_path) for app_record in tab.get_app_records()]
+        model.append((tab.name, [(dict(app_record.app_data), app_record.conan_ref, app_record.icon)
+                                 for app_record in app_records]))
+    ConfigSnapshot(config_file_path).save(content_hash, model)
+
+
+def _validate_config(app_config: Dict[str, Any]):
+    """ Validate the config with the compiled schema and raise the most relevant error """
+    error = jsonschema.exceptions.best_match(_get_config_validator().iter_errors(app_config))
+    if error is not None:
+        raise error
+
+
+def _get_config_validator():
+    """ Load the config schema and compile it into a validator - only once """
+    global _config_validator, _latest_config_version
+    if _config_validator is None:
+        with open(this.base_path / "assets" / "config_schema.json") as schema_file:
+            json_schema = json.load(schema_file)
+        validator_class = jsonschema.validators.validator_for(json_schema)
+        validator_class.check_schema(json_schema)
+        _latest_config_version = json_schema.get("properties").get("version").get("enum")[-1]
+        _config_validator = validator_class(json_schema)
+    return _config_validator
+
+
+def _get_content_hash(content: bytes) -> str:
+    """ Hash independent of the line endings, which are converted by text mode writes on Windows """
+    return hashlib.sha256(content.replace(b"\r\n", b"\n")).hexdigest()
+
+
 def write_config_file(config_file_path: Path, tab_entries: List[TabEntry]):
-    # create json dict from model
+    """ Write the model to the config file """
+    mark_config_written(tab_entries)
+    content = dump_config(tab_entries)
+    write_file_atomic(config_file_path, content)
+    mark_config_content_valid(content)
+    save_config_snapshot(config_file_path, content, tab_entries)
+
+
+def dump_config(tab_entries: List[TabEntry]) -> str:
+    """ Create the json content of the config file from the model """
     tabs_data: List[TabType] = []
     for tab in tab_entries:
         apps_data: List[AppType] = []
-        for app_entry in tab.get_app_entries():
-            apps_data.append(app_entry.app_data)
+        for app_data in tab.get_app_data():
+            apps_data.append(dict(app_data))  # the copy can't change while serializing
         tab_data: TabType = {"name": tab.name, "apps": apps_data}
         tabs_data.append(tab_data)
+    app_config: AppConfigType = {"version": get_latest_config_version(), "tabs": tabs_data}
+    return json.dumps(app_config, indent=4)
 
-    # get last version
-    with open(this.base_path / "assets" / "config_schema.json") as schema_file:
-        json_schema = json.load(schema_file)
-    version = json_schema.get("properties").get("version").get("enum")[-1]
-    app_config: AppConfigType = {"version": version, "tabs": tabs_data}
 
-    with open(str(config_file_path), "w") as config_file:
-        json.dump(app_config, config_file, indent=4)
+def get_latest_config_version() -> str:
+    """ Get the latest version of the config schema """
+    _get_config_validator()
+    return _latest_config_version
+
+
+def mark_config_content_valid(content: str):
+    """ Skip the validation of content, which was created from a valid model """
+    _validated_hashes.add(_get_content_hash(content.encode("utf-8")))
+
+
+def is_config_dirty(tab_entries: List[TabEntry]) -> bool:
+    """ Check, if the model changed since the last write """
+    for tab in tab_entries:
+        if tab.dirty or any(app_entry.dirty for app_entry in tab.get_loaded_app_entries()):
+            return True
+    return False
+
+
+def mark_config_written(tab_entries: List[TabEntry]):
+    for tab in tab_entries:
+        tab.dirty = False
+        for app_entry in tab.get_loaded_app_entries():
+            app_entry.dirty = False
+
+
+def write_file_atomic(file_path: Path, content: str):
+    """
+    Write to a temporary file and replace the file, so it can't be truncated by a crash.
+    A symlink is kept and its target is replaced. The permissions of the replaced file are kept.
+    """
+    target_path = Path(os.path.realpath(str(file_path)))
+    fd, temp_path = tempfile.mkstemp(dir=str(target_path.parent), prefix=target_path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as temp_file:
+            temp_file.write(content)
+        if target_path.is_file():
+            shutil.copymode(str(target_path), temp_path)
+        os.replace(temp_path, str(target_path))
+    except BaseException:
+        os.remove(temp_path)
+        raise
@@ -0,0 +1,55 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+import conan_app_launcher as this
+from conan_app_launcher.base import Logger
+
+
+class ConfigSnapshot():
+    """
+    Binary snapshot of the parsed and migrated model of a config file, to skip parsing and validation at the start.
+    It is only valid for the config file with the same modification time, size and content hash
+    and for the same version of this application.
+    """
+    SNAPSHOT_FILE_PREFIX = "config_snapshot_"
+
+    def __init__(self, config_file_path: Path, cache_dir: Optional[Path] = None):
+        if cache_dir is None:
+            cache_dir = this.cache_path
+        path_hash = hashlib.sha1(str(Path(config_file_path).absolute()).encode("utf-8")).hexdigest()[:16]
+        self._config_file_path = config_file_path
+        self._snapshot_file = Path(cache_dir) / f"{self.SNAPSHOT_FILE_PREFIX}{path_hash}.pickle"
+
+    def load(self, content_hash: str) -> Optional[Any]:
+        """ Get the model data, if the snapshot is valid for the current config file """
+        if not self._snapshot_file.is_file():
+            return None
+        try:
+            with open(str(self._snapshot_file), "rb") as snapshot_file:
+                snapshot = pickle.load(snapshot_file)
+            if snapshot.get("key") != self._get_key(content_hash):
+                return None
+            return snapshot.get("model")
+        except Exception as error:
+            Logger().debug(f"Can't read config snapshot {str(self._snapshot_file)}: {str(error)}")
+        return None
+
+    def save(self, content_hash: str, model: Any):
+        """ Write the model data atomically for the current state of the config file """
+        try:
+            self._snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+            snapshot = {"key": self._get_key(content_hash), "model": model}
+            fd, temp_path = tempfile.mkstemp(dir=str(self._snapshot_file.parent), suffix=".tmp")
+            with os.fdopen(fd, "wb") as temp_file:
+                pickle.dump(snapshot, temp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, str(self._snapshot_file))
+        except Exception as error:
+            Logger().debug(f"Can't write config snapshot {str(self._snapshot_file)}: {str(error)}")
+
+    def _get_key(self, content_hash: str):
+        stat = os.stat(str(self._config_file_path))
+        return (this.__version__, stat.st_mtime_ns, stat.st_size, content_hash)
@@ -0,0 +1,86 @@
+from pathlib import Path
+from threading import Lock, Timer
+from typing import List, Optional
+
+from conan_app_launcher.base import Logger
+from conan_app_launcher.components.config_file import (TabEntry, dump_config, is_config_dirty,
+                                                       is_config_read_only, mark_config_content_valid,
+                                                       mark_config_written, save_config_snapshot,
+                                                       write_file_atomic)
+
+
+class ConfigFileWriter():
+    """
+    Writes the config file of a model in the background.
+    All write requests within the debounce time are coalesced into one write, which is skipped,
+    if nothing is dirty or the content is unchanged. The file is replaced atomically.
+    A read only config is never written.
+    """
+
+    def __init__(self, config_file_path: Path, tab_entries: List[TabEntry], debounce_s: float = 1.0,
+                 read_only: bool = False):
+        self._config_file_path = config_file_path
+        self._read_only = read_only
+        self._tab_entries = tab_entries
+        self._debounce_s = debounce_s
+        self._timer: Optional[Timer] = None
+        self._timer_lock = Lock()
+        self._write_lock = Lock()  # a flush can run concurrently to a timed write
+        self._last_content: Optional[str] = None
+
+    def request_write(self):
+        """ Write after the debounce time - a new request restarts it """
+        with self._timer_lock:
+            if self._timer:
+                self._timer.cancel()
+            self._timer = Timer(self._debounce_s, self.write)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """ Write a pending request immediately, e.g. before exiting """
+        with self._timer_lock:
+            timer, self._timer = self._timer, None
+        if timer:
+            timer.cancel()
+            self.write()
+
+    def discard_pending(self):
+        """ Cancel a pending write, e.g. because the file was changed by someone else """
+        with self._timer_lock:
+            timer, self._timer = self._timer, None
+        if timer:
+            timer.cancel()
+        with self._write_lock:
+            self._last_content = None
+
+    def is_written_content(self, content: str) -> bool:
+        """ Check, if this is the content of the last write """
+        with self._write_lock:
+            return self._last_content is not None and content == self._last_content
+
+    def write(self) -> bool:
+        """ Write the model, if it changed. Returns, if the file was written. """
+        with self._write_lock:
+            if not is_config_dirty(self._tab_entries):
+                return False
+            if is_config_read_only(self._config_file_path, self._read_only):
+                Logger().debug(f"Config file {str(self._config_file_path)} is read only - changes are not saved")
+                return False
+            # changes during the serialization mark the model dirty again
+            mark_config_written(self._tab_entries)
+            content = dump_config(self._tab_entries)
+            if self._last_content is None and self._config_file_path.is_file():
+                self._last_content = self._config_file_path.read_text()
+            if content == self._last_content:
+                return False
+            try:
+                write_file_atomic(self._config_file_path, content)
+            except Exception as error:
+                Logger().error(f"Can't write config file {str(self._config_file_path)}: {str(error)}")
+                return False
+            self._last_content = content
+            mark_config_content_valid(content)
+            save_config_snapshot(self._config_file_path, content, self._tab_entries)
+            Logger().debug(f"Written config file {str(self._config_file_path)}")
+            return True
@@ -0,0 +1,199 @@
+import json
+import os
+import stat
+import tempfile
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from threading import Event, Lock
+from typing import List, Optional, Tuple
+
+from conan_app_launcher.base import Logger
+
+
+class FolderDeleter():
+    """
+    Deletes folders in the background.
+    Every folder is first renamed into a trash folder, which is quick and atomic,
+    then the trash folders are deleted by parallel workers.
+    The trash folder is in one of the given trash dirs, whose parent contains the folder, so it stays on the
+    same drive and outside of e.g. the conan cache layout. Without a matching trash dir it is next to the folder.
+    The trash folders are recorded in a journal, so that the leftovers of an interrupted deletion
+    are deleted at the next start.
+    """
+    JOURNAL_FILE_NAME = "trash_journal.json"
+    TRASH_PREFIX = ".cal_trash_"
+    TRASH_DIR_NAME = ".cal_trash"
+
+    def __init__(self, journal_dir: Path, max_workers: int = 4):
+        self._journal_file = Path(journal_dir) / self.JOURNAL_FILE_NAME
+        self._lock = Lock()
+        self._stop = Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="FolderDeleter")
+        self._futures: List[Future] = []
+        self._journal: List[str] = self._load_journal()
+
+    def delete(self, paths: List[str], trash_dirs: Optional[List[str]] = None) -> "Future[Tuple[int, int]]":
+        """
+        Move the folders into trash and delete them in the background.
+        The returned future has the freed bytes and the number of deleted entries.
+        """
+        trash_paths = []
+        for path in paths:
+            trash_path = self._move_to_trash(path, trash_dirs or [])
+            if trash_path:
+                trash_paths.append(trash_path)
+        return self._delete_in_background(trash_paths)
+
+    def purge_leftovers(self) -> "Future[Tuple[int, int]]":
+        """ Delete the trash folders of an interrupted deletion in the background """
+        with self._lock:
+            trash_paths = list(self._journal)
+        if trash_paths:
+            Logger().debug(f"Deleting {len(trash_paths)} leftover trash folders")
+        return self._delete_in_background(trash_paths)
+
+    def shutdown(self):
+        """ Stop deleting. Not deleted trash folders stay in the journal. """
+        self._stop.set()
+        with self._lock:
+            for future in self._futures:
+                future.cancel()  # only possible for not yet started deletions
+        self._executor.shutdown(wait=False)
+
+    def _move_to_trash(self, path: str, trash_dirs: List[str]) -> Optional[str]:
+        """ Rename a folder into a trash folder on the same drive """
+        trash_path = self._get_trash_path(path, trash_dirs)
+        try:
+            os.makedirs(os.path.dirname(trash_path), exist_ok=True)
+        except OSError as error:
+            Logger().debug(f"Can't create trash folder for {path}: {str(error)}")
+        # record first, so that a trash folder can't be lost
+        with self._lock:
+            self._journal.append(trash_path)
+            self._save_journal()
+        try:
+            os.rename(path, trash_path)
+            return trash_path
+        except OSError as error:
+            Logger().debug(f"Can't move {path} to trash: {str(error)}")
+        with self._lock:
+            self._journal.remove(trash_path)
+            self._save_journal()
+        # delete in place
+        return path if os.path.isdir(path) else None
+
+    def _get_trash_path(self, path: str, trash_dirs: List[str]) -> str:
+        """ Get a new trash folder in the trash dir, whose parent contains the path, or next to the path """
+        path = os.path.normpath(os.path.abspath(path))
+        for trash_dir in trash_dirs:
+            trash_dir = os.path.normpath(os.path.abspath(trash_dir))
+            try:
+                if os.path.commonpath([os.path.dirname(trash_dir), path]) == os.path.dirname(trash_dir):
+                    return os.path.join(trash_dir, uuid.uuid4().hex)
+            except ValueError:  # on different drives
+                continue
+        return os.path.join(os.path.dirname(path), self.TRASH_PREFIX + uuid.uuid4().hex)
+
+    def _delete_in_background(self, paths: List[str]) -> "Future[Tuple[int, int]]":
+        """ Delete the folders in parallel and sum up the freed bytes and deleted entries """
+        result: "Future[Tuple[int, int]]" = Future()
+        if not paths:
+            result.set_result((0, 0))
+            return result
+        try:
+            futures = [self._executor.submit(self._delete_tree, path) for path in paths]
+        except RuntimeError:  # already shut down
+            result.cancel()
+            return result
+        with self._lock:
+            self._futures = [future for future in self._futures if not future.done()] + futures
+        pending = [len(futures)]
+        freed = [0, 0]
+
+        def on_deleted(future: Future):
+            if not future.cancelled() and not future.exception():
+                freed_bytes, entries = future.result()
+                with self._lock:
+                    freed[0] += freed_bytes
+                    freed[1] += entries
+            with self._lock:
+                pending[0] -= 1
+                if pending[0] > 0:
+                    return
+            Logger().info(f"Deleted {len(paths)} folders with {freed[1]} entries "
+                          f"and freed {freed[0] / 1024 / 1024:.1f} MB")
+            result.set_result((freed[0], freed[1]))
+
+        for future in futures:
+            future.add_done_callback(on_deleted)
+        return result
+
+    def _delete_tree(self, path: str) -> Tuple[int, int]:
+        """ Delete a folder and count the freed bytes and deleted entries. Stops, if the deleter is shut down. """
+        freed_bytes = 0
+        entries = 0
+        for root, dir_names, file_names in os.walk(path, topdown=False):
+            if self._stop.is_set():
+                return freed_bytes, entries
+            for file_name in file_names:
+                file_path = os.path.join(root, file_name)
+                try:
+                    size = os.lstat(file_path).st_size
+                    self._remove(os.remove, file_path)
+                    freed_bytes += size
+                    entries += 1
+                except OSError as error:
+                    Logger().debug(f"Can't delete {file_path}: {str(error)}")
+            for dir_name in dir_names:
+                dir_path = os.path.join(root, dir_name)
+                try:
+                    # links to folders are listed as folder, but not walked into
+                    self._remove(os.remove if os.path.islink(dir_path) else os.rmdir, dir_path)
+                    entries += 1
+                except OSError as error:
+                    Logger().debug(f"Can't delete {dir_path}: {str(error)}")
+        try:
+            self._remove(os.rmdir, path)
+            entries += 1
+        except FileNotFoundError:
+            pass
+        except OSError as error:
+            Logger().debug(f"Can't delete {path}: {str(error)}")
+            return freed_bytes, entries
+        with self._lock:
+            if path in self._journal:
+                self._journal.remove(path)
+                self._save_journal()
+        return freed_bytes, entries
+
+    @staticmethod
+    def _remove(remove_function, path: str):
+        """ Remove a file or folder, also if it is write protected (read-only files on Windows) """
+        try:
+            remove_function(path)
+        except PermissionError:
+            os.chmod(path, stat.S_IWRITE | stat.S_IREAD | stat.S_IEXEC)
+            remove_function(path)
+
+    def _load_journal(self) -> List[str]:
+        """ Read the journal. A missing or corrupt file results in an empty journal. """
+        if not self._journal_file.is_file():
+            return []
+        try:
+            with open(str(self._journal_file), encoding="utf-8") as journal_file:
+                return [str(path) for path in json.load(journal_file)]
+        except Exception as error:
+            Logger().debug(f"Can't read trash journal {str(self._journal_file)}: {str(error)}")
+            return []
+
+    def _save_journal(self):
+        """ Write the journal atomically. Must be called with the lock held. """
+        try:
+            self._journal_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=str(self._journal_file.parent), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+                json.dump(self._journal, temp_file)
+            os.replace(temp_path, str(self._journal_file))
+        except Exception as error:
+            Logger().debug(f"Can't write trash journal {str(self._journal_file)}: {str(error)}")
@@ -0,0 +1,111 @@
+"""
+Headless commands of Conan App Launcher, which don't need the gui.
+warm: resolves and installs the packages of all apps in a config file, e.g. to provision a new machine.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from conans.model.ref import ConanFileReference
+
+import conan_app_launcher as this
+from conan_app_launcher.base import Logger
+from conan_app_launcher.components import ConanApiPool, ConanOfflineMode, parse_config_file
+from conan_app_launcher.settings import CONFIG_READ_ONLY, LAST_CONFIG_FILE, Settings
+
+try:
+    from typing import TypedDict
+except ImportError:
+    from typing_extensions import TypedDict
+
+
+class WarmRefReport(TypedDict):
+    """ Result of warming up one ref with its options """
+
+    ref: str
+    options: Dict[str, str]
+    resolved: bool
+    id: str
+    folder: str
+    remote: str  # empty, if the package was already available
+    package_folder_bytes: int  # of a package installed in this run, not the size of the download
+    duration_s: float
+    error: str  # empty, if the resolution did not raise an error
+
+
+def warm(config_file_path: Path, jobs: int = 4, read_only: bool = False) -> Dict[str, Any]:
+    """ Resolve and install the packages of all unique refs of a config file in parallel and return a report """
+    start_time = time.monotonic()
+    refs: List[Tuple[str, Dict[str, str]]] = []
+    for tab in parse_config_file(config_file_path, read_only):
+        for app in tab.get_app_entries():
+            ref = (str(app.conan_ref), app.conan_options)
+            if ref not in refs:
+                refs.append(ref)
+    # the first ConanApi initializes the conan home - don't do this concurrently
+    with ConanApiPool().leased():
+        pass
+    with ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="ConanWarm") as executor:
+        ref_reports = list(executor.map(lambda ref: _warm_ref(*ref), refs))
+    return {
+        "config_file": str(config_file_path),
+        "jobs": jobs,
+        "duration_s": round(time.monotonic() - start_time, 3),
+        "resolved": len([report for report in ref_reports if report["resolved"]]),
+        "failed": len([report for report in ref_reports if not report["resolved"]]),
+        "package_folder_bytes": sum(report["package_folder_bytes"] for report in ref_reports),
+        "refs": ref_reports,
+    }
+
+
+def _warm_ref(conan_ref: str, conan_options: Dict[str, str]) -> WarmRefReport:
+    """ Resolve and install the package of one ref with a pooled ConanApi - an error fails only this ref """
+    start_time = time.monotonic()
+    try:
+        with ConanApiPool().leased() as conan:
+            result = conan.resolve_package(ConanFileReference.loads(conan_ref), conan_options)
+    except Exception as error:
+        Logger().error(f"Can't resolve {conan_ref}: {str(error)}")
+        return {"ref": conan_ref, "options": conan_options, "resolved": False, "id": "", "folder": "",
+                "remote": "", "package_folder_bytes": 0,
+                "duration_s": round(time.monotonic() - start_time, 3), "error": str(error)}
+    return {"ref": conan_ref, "options": conan_options, "resolved": Path(result["folder"]).is_dir(),
+            "id": result["id"], "folder": result["folder"], "remote": result["remote"],
+            "package_folder_bytes": result["package_folder_bytes"],
+            "duration_s": round(time.monotonic() - start_time, 3), "error": ""}
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    """ Entry point of the warm command. Prints the json report and returns 1, if a ref could not be resolved. """
+    parser = argparse.ArgumentParser(
+        prog=f"{this.PROG_NAME} warm",
+        description="Resolve and install the packages of all apps in a config file without gui.")
+    parser.add_argument("config_file", nargs="?", help="config file (default: the last used one)")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="number of parallel resolutions (default: 4)")
+    parser.add_argument("--offline", action="store_true", help="use only the local conan cache")
+    parsed_args = parser.parse_args(args)
+
+    this.base_path = Path(__file__).absolute().parent
+    Logger()  # log to stderr
+    settings = Settings(ini_file=Path.home() / ".cal_config")
+    config_file = parsed_args.config_file
+    if not config_file:
+        config_file = settings.get(LAST_CONFIG_FILE)
+    if not config_file or not Path(config_file).is_file():
+        Logger().error(f"Config file '{config_file}' does not exist.")
+        return 1
+    ConanOfflineMode().set_forced(parsed_args.offline)
+    # conan writes its output to stdout - keep it free for the report
+    with redirect_stdout(sys.stderr):
+        report = warm(Path(config_file), parsed_args.jobs, settings.get(CONFIG_READ_ONLY))
+    print(json.dumps(report, indent=4))
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@
 Entry module of Conan App Launcher
 Sets up cmd arguments, config file and starts the gui
 """
+import argparse
 import os
 import sys
 import traceback
@@ -13,6 +14,7 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 import conan_app_launcher as this
 from conan_app_launcher.settings import Settings
 from conan_app_launcher.base import Logger
+from conan_app_launcher.components import ConanOfflineMode
 from conan_app_launcher.ui import main_ui
 
 try:
@@ -30,8 +32,18 @@ Qt = QtCore.Qt
 
 def main():
     """
-    Start the Qt application
+    Start the Qt application or a headless command
     """
+    if sys.argv[1:2] == ["warm"]:
+        from conan_app_launcher import headless
+        sys.exit(headless.main(sys.argv[2:]))
+    parser = argparse.ArgumentParser(prog=this.PROG_NAME, allow_abbrev=False,
+                                     epilog=f"Headless command: {this.PROG_NAME} warm --help")
+    parser.add_argument("--offline", action="store_true", help="use only the local conan cache for this session")
+    # unknown arguments are ignored, like before
+    args, _ = parser.parse_known_args()
+    if args.offline:
+        ConanOfflineMode().set_forced(True)
 
     if platform.system() == "Darwin":
         print("Mac OS is currently not supported.")
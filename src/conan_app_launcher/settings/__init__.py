@@ -8,6 +8,13 @@
 LAST_CONFIG_FILE = "last_config_file"
 DISPLAY_APP_VERSIONS = "disp_app_versions"
 DISPLAY_APP_CHANNELS = "disp_app_channels"
+CONFIG_READ_ONLY = "config_read_only"
+# conan
+CONAN_WORKER_NUM = "conan_worker_num"
+CONAN_PROCESS_RESOLVER = "conan_process_resolver"
+CONAN_RECIPES_CACHE_TTL = "conan_recipes_cache_ttl_s"
+CONAN_API_IDLE_TIMEOUT = "conan_api_idle_timeout_s"
+CONAN_OFFLINE = "conan_offline"
 
 
 # import at the end, to avoid circular imports
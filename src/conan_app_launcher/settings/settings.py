@@ -3,7 +3,9 @@ from pathlib import Path
 from typing import Any
 
 from conan_app_launcher.base import Logger
-from conan_app_launcher.settings import LAST_CONFIG_FILE, DISPLAY_APP_VERSIONS, DISPLAY_APP_CHANNELS
+from conan_app_launcher.settings import (LAST_CONFIG_FILE, DISPLAY_APP_VERSIONS, DISPLAY_APP_CHANNELS,
+                                         CONAN_WORKER_NUM, CONAN_PROCESS_RESOLVER, CONAN_RECIPES_CACHE_TTL,
+                                         CONAN_API_IDLE_TIMEOUT, CONAN_OFFLINE, CONFIG_READ_ONLY)
 
 
 class Settings():
@@ -15,6 +17,7 @@ class Settings():
     # internal constants
     _GENERAL_SECTION_NAME = "General"
     _VIEW_SECTION_NAME = "View"
+    _CONAN_SECTION_NAME = "Conan"
 
     def __init__(self, ini_file: Path):
         """
@@ -35,9 +38,16 @@ class Settings():
         self._values = {
             # general
             LAST_CONFIG_FILE: "",
+            CONFIG_READ_ONLY: False,
             # view
             DISPLAY_APP_CHANNELS: True,
-            DISPLAY_APP_VERSIONS: True
+            DISPLAY_APP_VERSIONS: True,
+            # conan
+            CONAN_WORKER_NUM: 4,
+            CONAN_PROCESS_RESOLVER: False,
+            CONAN_RECIPES_CACHE_TTL: 3600,
+            CONAN_API_IDLE_TIMEOUT: 600,
+            CONAN_OFFLINE: False
         }
 
         self._read_ini()
@@ -56,8 +66,14 @@ class Settings():
         """ Save all user modifiable options to file. """
         # All writeable settings must be listed here!
         self._write_setting(LAST_CONFIG_FILE, self._GENERAL_SECTION_NAME)
+        self._write_setting(CONFIG_READ_ONLY, self._GENERAL_SECTION_NAME)
         self._write_setting(DISPLAY_APP_CHANNELS, self._VIEW_SECTION_NAME)
         self._write_setting(DISPLAY_APP_CHANNELS, self._VIEW_SECTION_NAME)
+        self._write_setting(CONAN_WORKER_NUM, self._CONAN_SECTION_NAME)
+        self._write_setting(CONAN_PROCESS_RESOLVER, self._CONAN_SECTION_NAME)
+        self._write_setting(CONAN_RECIPES_CACHE_TTL, self._CONAN_SECTION_NAME)
+        self._write_setting(CONAN_API_IDLE_TIMEOUT, self._CONAN_SECTION_NAME)
+        self._write_setting(CONAN_OFFLINE, self._CONAN_SECTION_NAME)
 
         with self._ini_file_path.open('w', encoding="utf8") as ini_file:
             self._parser.write(ini_file)
@@ -69,9 +85,16 @@ class Settings():
         # All settings and their sections must be listed here!
         general_section = self._get_section(self._GENERAL_SECTION_NAME)
         self._read_setting(LAST_CONFIG_FILE, general_section)
+        self._read_setting(CONFIG_READ_ONLY, general_section)
         view_section = self._get_section(self._VIEW_SECTION_NAME)
         self._read_setting(DISPLAY_APP_CHANNELS, view_section)
         self._read_setting(DISPLAY_APP_VERSIONS, view_section)
+        conan_section = self._get_section(self._CONAN_SECTION_NAME)
+        self._read_setting(CONAN_WORKER_NUM, conan_section)
+        self._read_setting(CONAN_PROCESS_RESOLVER, conan_section)
+        self._read_setting(CONAN_RECIPES_CACHE_TTL, conan_section)
+        self._read_setting(CONAN_API_IDLE_TIMEOUT, conan_section)
+        self._read_setting(CONAN_OFFLINE, conan_section)
 
         # write file - to record defaults, if missing
         with self._ini_file_path.open('w', encoding="utf8") as ini_file:
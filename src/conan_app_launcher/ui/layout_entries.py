@@ -15,14 +15,14 @@ Qt = QtCore.Qt
 
 
 class AppUiEntry(QtWidgets.QVBoxLayout):
-    def __init__(self, parent: QtWidgets.QTabWidget, app: AppEntry, gui_update_signal: QtCore.pyqtSignal):
+    def __init__(self, parent: QtWidgets.QTabWidget, app: AppEntry, config_changed_signal: QtCore.pyqtSignal):
         super().__init__(parent)
         self._app_info = app
         self._app_button = AppButton(parent, app.icon)
         self._app_name_label = QtWidgets.QLabel(parent)
         self._app_version_cbox = QtWidgets.QComboBox(parent)
         self._app_channel_cbox = QtWidgets.QComboBox(parent)
-        self._gui_update_signal = gui_update_signal
+        self._config_changed_signal = config_changed_signal
 
         self.setObjectName(parent.objectName() + app.name)  # to find it for tests
         self.setSpacing(5)
@@ -65,9 +65,14 @@ class AppUiEntry(QtWidgets.QVBoxLayout):
         elif platform.system() == "Windows":
             os.system("explorer " + str(self._app_info.executable.parent))
 
+    @property
+    def app_info(self) -> AppEntry:
+        return self._app_info
+
     def update_entry(self, settings: Settings):
-        # set icon and ungrey if package is available
-        if self._app_info.executable.is_file():
+        # set icon and ungrey if package is available - decode the icon only, if it changed
+        if self._app_info.executable.is_file() and (self._app_button.greyed_out
+                                                    or self._app_button.image != self._app_info.icon):
             self._app_button.set_icon(self._app_info.icon)
             self._app_button.ungrey_icon()
 
@@ -112,6 +117,8 @@ class AppUiEntry(QtWidgets.QVBoxLayout):
 
         self._app_info.channel = self._app_info.INVALID_DESCR
         self._app_info.version = self._app_version_cbox.currentText()
+        if self._config_changed_signal:
+            self._config_changed_signal.emit()
 
     def channel_selected(self, index):
         if not self._app_channel_cbox.isEnabled():
@@ -122,6 +129,8 @@ class AppUiEntry(QtWidgets.QVBoxLayout):
             return
         self._app_button.grey_icon()
         self._app_info.channel = self._app_channel_cbox.currentText()
+        if self._config_changed_signal:
+            self._config_changed_signal.emit()
 
 
 class TabUiGrid(QtWidgets.QWidget):
@@ -1,29 +1,68 @@
 from pathlib import Path
-from typing import List
-from shutil import rmtree
+from typing import Dict, List, Optional, Set, Tuple
 from pathlib import Path
+from threading import Event, Thread
 
 from PyQt5 import QtCore, QtWidgets, uic
 
 import conan_app_launcher as this
 from conan_app_launcher.base import Logger
-from conan_app_launcher.components import ConanWorker, parse_config_file, write_config_file, ConanApi
-from conan_app_launcher.settings import LAST_CONFIG_FILE, DISPLAY_APP_VERSIONS, DISPLAY_APP_CHANNELS, Settings
+from conan_app_launcher.components import (AppEntry, TabEntry, ConanWorker, parse_config_file,
+                                           ConfigFileWriter, ConanApiPool, ConanOfflineMode, FolderDeleter)
+from conan_app_launcher.components.config_file import mark_config_written, merge_app_entries
+from conan_app_launcher.settings import (LAST_CONFIG_FILE, DISPLAY_APP_VERSIONS, DISPLAY_APP_CHANNELS,
+                                         CONAN_WORKER_NUM, CONAN_PROCESS_RESOLVER, CONAN_RECIPES_CACHE_TTL,
+                                         CONAN_API_IDLE_TIMEOUT, CONAN_OFFLINE, CONFIG_READ_ONLY, Settings)
 from conan_app_launcher.ui.layout_entries import AppUiEntry, TabUiGrid
 
 
 class MainUi(QtWidgets.QMainWindow):
     """ Instantiates MainWindow and holds all UI objects """
-    conan_info_updated = QtCore.pyqtSignal()
+    REFRESH_INTERVAL_MS = 16  # updates of apps are collected and applied once per frame
+    RELOAD_DELAY_MS = 300  # editors can write a file in multiple steps
+    conan_info_updated = QtCore.pyqtSignal(str)  # str arg is the conan ref of the updated apps
+    config_changed = QtCore.pyqtSignal()
     new_message_logged = QtCore.pyqtSignal(str)  # str arg is the message
+    cleanup_scan_progressed = QtCore.pyqtSignal(int, int, str)  # checked folders, all folders, orphaned folder
+    cleanup_scan_finished = QtCore.pyqtSignal()
+    offline_mode_changed = QtCore.pyqtSignal(bool)  # bool arg is the new state
 
     def __init__(self, settings: Settings):
         super().__init__()
         self._ui = uic.loadUi(this.base_path / "ui" / "qt" / "app_grid.ui", baseinstance=self)
         self._settings = settings
+        ConanApiPool().idle_timeout_s = settings.get(CONAN_API_IDLE_TIMEOUT)
         self._tab_info: List[TabUiGrid] = []
+        self._config_writer: Optional[ConfigFileWriter] = None
         self._about_dialog = AboutDialog(self)
         self._tab = None
+        self._unloaded_tabs: Dict[TabUiGrid, TabEntry] = {}  # the apps are created, when the tab is shown
+        # conan ref -> entries with this ref, None if it must be rebuilt
+        self._app_ui_entries: Optional[Dict[str, List[AppUiEntry]]] = None
+        self._updated_refs: Set[str] = set()
+        self._refresh_timer = QtCore.QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(self.REFRESH_INTERVAL_MS)
+        self._refresh_timer.timeout.connect(self._refresh_updated_entries)
+        # apply external changes of the config file
+        self._config_watcher = QtCore.QFileSystemWatcher(self)
+        self._config_watcher.fileChanged.connect(self._on_config_file_changed)
+        self._reload_timer = QtCore.QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(self.RELOAD_DELAY_MS)
+        self._reload_timer.timeout.connect(self.reload_config_file)
+        self._cleanup_paths: List[str] = []
+        self._cleanup_trash_dirs: List[str] = []
+        self._cleanup_cancel = Event()
+        self._cleanup_progress: Optional[QtWidgets.QProgressDialog] = None
+        # finish deletions of a previous session, which was closed meanwhile
+        self._folder_deleter = FolderDeleter(this.cache_path)
+        self._folder_deleter.purge_leftovers()
+        # the offline mode can already be set with a command line argument
+        if settings.get(CONAN_OFFLINE):
+            ConanOfflineMode().set_forced(True)
+        self._offline_label = QtWidgets.QLabel(self)
+        self._ui.statusbar.addPermanentWidget(self._offline_label)
 
         # connect logger to console widget to log possible errors at init
         Logger.init_qt_logger(self)
@@ -34,18 +73,36 @@ class MainUi(QtWidgets.QMainWindow):
         self._ui.menu_set_display_versions.triggered.connect(self.toggle_display_versions)
         self._ui.menu_set_display_channels.triggered.connect(self.toogle_display_channels)
         self._ui.menu_cleanup_cache.triggered.connect(self.open_cleanup_cache_dialog)
+        self._ui.menu_offline_mode.triggered.connect(self.toggle_offline_mode)
+        self._ui.tabs.currentChanged.connect(self._on_tab_changed)
 
-        self.conan_info_updated.connect(self.update_layout)
+        self.conan_info_updated.connect(self._on_conan_info_updated)
+        self.config_changed.connect(self.save_all_configs)
+        self.config_changed.connect(self._invalidate_app_ui_entries)  # the ref of an app can be changed
         self.new_message_logged.connect(self.write_log)
+        self.cleanup_scan_progressed.connect(self._on_cleanup_scan_progressed)
+        self.cleanup_scan_finished.connect(self._on_cleanup_scan_finished)
+        # can be changed from any thread
+        self.offline_mode_changed.connect(self._on_offline_mode_changed)
+        ConanOfflineMode().add_listener(self.offline_mode_changed.emit)
+        self._on_offline_mode_changed(ConanOfflineMode().is_offline)
 
         self.init_gui()
 
     def save_all_configs(self):
-        write_config_file(Path(self._settings.get(LAST_CONFIG_FILE)), self._tab_info)
+        """ Write the changed config in the background - changes in quick succession are written at once """
+        if self._config_writer:
+            self._config_writer.request_write()
 
     def closeEvent(self, event):  # override QMainWindow
         """ Remove qt logger, so it doesn't log into a non existant object """
         super().closeEvent(event)
+        self._cleanup_cancel.set()
+        ConanOfflineMode().remove_listener(self.offline_mode_changed.emit)
+        self._folder_deleter.shutdown()  # the rest is deleted at the next start
+        self._reload_timer.stop()
+        if self._config_writer:
+            self._config_writer.flush()
         try:
             self.new_message_logged.disconnect(self.write_log)
         except Exception:
@@ -54,9 +111,55 @@ class MainUi(QtWidgets.QMainWindow):
         Logger.remove_qt_logger()
 
     def open_cleanup_cache_dialog(self):
+        """ Search for invalid cache folders in the background and show the progress """
+        if self._cleanup_progress:  # already searching
+            return
+        self._cleanup_paths = []
+        self._cleanup_cancel = Event()
+        self._cleanup_progress = QtWidgets.QProgressDialog(
+            "Searching for invalid cache folders...", "Cancel", 0, 0, self)
+        self._cleanup_progress.setWindowTitle("Clean up cache")
+        self._cleanup_progress.canceled.connect(self._cleanup_cancel.set)
+        self._cleanup_progress.setValue(0)
+        Thread(target=self._scan_cleanup_cache_paths, name="ConanCleanupScan", daemon=True).start()
+
+    def _scan_cleanup_cache_paths(self):
+        """ Search for invalid cache folders - runs in a background thread and reports with signals """
+        try:
+            # the first ConanApi initializes the conan home - don't do this concurrently to the worker
+            if this.conan_worker:
+                this.conan_worker.wait_for_conan()
+            with ConanApiPool().leased() as conan:
+                self._cleanup_trash_dirs = conan.get_cleanup_trash_dirs()
+                for checked_num, all_num, path in conan.iter_cleanup_cache_paths(self._cleanup_cancel):
+                    # limit the gui updates for big caches
+                    if path or checked_num % 100 == 0 or checked_num == all_num:
+                        self.cleanup_scan_progressed.emit(checked_num, all_num, path)
+        except Exception as error:
+            Logger().error(f"Can't search for invalid cache folders: {str(error)}")
+        finally:
+            self.cleanup_scan_finished.emit()
+
+    def _on_cleanup_scan_progressed(self, checked_num: int, all_num: int, path: str):
+        """ Show the progress of the search for invalid cache folders """
+        if path:
+            self._cleanup_paths.append(path)
+        if self._cleanup_progress:
+            self._cleanup_progress.setMaximum(all_num)
+            self._cleanup_progress.setValue(checked_num)
+            self._cleanup_progress.setLabelText(
+                f"Searching for invalid cache folders... Found {len(self._cleanup_paths)}")
+
+    def _on_cleanup_scan_finished(self):
         """ Open the message box to confirm deletion of invalid cache folders """
-        conan = ConanApi()
-        paths = conan.get_cleanup_cache_paths()
+        canceled = self._cleanup_cancel.is_set()  # closing the progress dialog also cancels
+        if self._cleanup_progress:
+            self._cleanup_progress.close()
+            self._cleanup_progress = None
+        if canceled:
+            self.write_log("INFO: Cache clean up canceled.")
+            return
+        paths = self._cleanup_paths
         if not paths:
             self.write_log("INFO: Nothing found in cache to clean up.")
             return
@@ -73,8 +176,8 @@ class MainUi(QtWidgets.QMainWindow):
         msg.setIcon(QtWidgets.QMessageBox.Question)
         reply = msg.exec_()
         if reply == QtWidgets.QMessageBox.Yes:
-            for path in paths:
-                rmtree(str(path), ignore_errors=True)
+            self.write_log(f"INFO: Deleting {len(paths)} folders in the background...")
+            self._folder_deleter.delete(paths, self._cleanup_trash_dirs)
 
     def open_config_file_dialog(self):
         """" Open File Dialog and load config file """
@@ -99,40 +202,232 @@ class MainUi(QtWidgets.QMainWindow):
         self._settings.set(DISPLAY_APP_CHANNELS, self._ui.menu_set_display_channels.isChecked())
         self.update_layout()
 
+    def toggle_offline_mode(self):
+        """ Reads the current menu setting, saves it and switches the offline mode """
+        self._settings.set(CONAN_OFFLINE, self._ui.menu_offline_mode.isChecked())
+        ConanOfflineMode().set_forced(self._ui.menu_offline_mode.isChecked())
+
+    def _on_offline_mode_changed(self, is_offline: bool):
+        """ Show the offline mode and resolve the missing packages again, when going online """
+        self._ui.menu_offline_mode.setChecked(ConanOfflineMode().is_forced)
+        if ConanOfflineMode().is_forced:
+            self._offline_label.setText("Offline mode")
+        else:
+            self._offline_label.setText("Offline mode (no connection to the remotes)")
+        self._offline_label.setVisible(is_offline)
+        if is_offline or not this.conan_worker:
+            return
+        for tab_info in self._tab_info:  # the apps of not yet loaded tabs are resolved on loading
+            for app_info in tab_info.get_loaded_app_entries():
+                if not app_info.package_folder.is_dir():
+                    this.conan_worker.put_ref_in_queue(str(app_info.conan_ref), app_info.conan_options, app_info)
+
     def create_layout(self):
-        """ Creates the tabs and app icons """
+        """ Creates the tabs - the app icons are created, when a tab is shown """
+        self._ui.tabs.blockSignals(True)  # the current tab is loaded after the conan worker is created
         for tab_info in self._tab_info:
             # need to save object locally, otherwise it can be destroyed in the underlying C++ layer
-            self._tab = TabUiGrid(self, tab_info.name)
-            row = 0  # 3
-            column = 0  # 4
-            for app_info in tab_info.get_app_entries():
-                # add in order of occurence
-                app = AppUiEntry(self._tab.tab_scroll_area_widgets, app_info, self.conan_info_updated)
-                self._tab.apps.append(app)
-                self._tab.tab_grid_layout.addLayout(app, row, column, 1, 1)
-                column += 1
-                if column == 4:
-                    column = 0
-                    row += 1
+            self._tab = self._create_tab(tab_info)
             self._ui.tabs.addTab(self._tab, tab_info.name)
+        self._ui.tabs.blockSignals(False)
+
+    def _create_tab(self, tab_info: TabEntry) -> TabUiGrid:
+        tab = TabUiGrid(self, tab_info.name)
+        self._unloaded_tabs[tab] = tab_info
+        return tab
+
+    def _load_tab(self, tab: Optional[QtWidgets.QWidget]):
+        """ Create the app entries and icons of a tab, which is shown the first time """
+        tab_info = self._unloaded_tabs.pop(tab, None)
+        if tab_info is None:
+            return
+        app_infos = tab_info.get_app_entries()
+        if this.conan_worker:  # sets the results, which are already known
+            this.conan_worker.update_app_entries(app_infos, [])
+        for app_info in app_infos:
+            app = AppUiEntry(tab.tab_scroll_area_widgets, app_info, self.config_changed)
+            app.update_entry(self._settings)
+            tab.apps.append(app)
+        self._layout_tab(tab)
+        self._app_ui_entries = None  # rebuilt on the next update
+
+    @staticmethod
+    def _layout_tab(tab: TabUiGrid):
+        """ Place the apps in order of occurence in rows of 4 """
+        for index, app in enumerate(tab.apps):
+            tab.tab_grid_layout.addLayout(app, index // 4, index % 4, 1, 1)
+
+    def _update_tab(self, tab: TabUiGrid, app_infos: List[AppEntry]):
+        """ Keep the entries of unchanged apps, create the new ones, delete the others and place them again """
+        current_apps = {app.app_info: app for app in tab.apps}
+        for app in tab.apps:
+            tab.tab_grid_layout.removeItem(app)
+        tab.apps = []
+        for app_info in app_infos:
+            app = current_apps.pop(app_info, None)
+            if app is None:
+                app = AppUiEntry(tab.tab_scroll_area_widgets, app_info, self.config_changed)
+                app.update_entry(self._settings)  # can already have package info
+            tab.apps.append(app)
+        for app in current_apps.values():
+            while app.count():
+                widget = app.takeAt(0).widget()
+                if widget:
+                    widget.setParent(None)
+                    widget.deleteLater()
+            app.deleteLater()
+        self._layout_tab(tab)
+
+    def _watch_config_file(self, config_file_path: Path):
+        """ Watch only the current config file. It must be added again, after it was replaced. """
+        watched_files = self._config_watcher.files()
+        if watched_files == [str(config_file_path)]:
+            return
+        if watched_files:
+            self._config_watcher.removePaths(watched_files)
+        if config_file_path.is_file():
+            self._config_watcher.addPath(str(config_file_path))
+
+    def _on_config_file_changed(self, path: str):
+        """ Reload after the changes are finished """
+        self._reload_timer.start()
+
+    def reload_config_file(self):
+        """
+        Apply the changes of the config file to the current tabs and apps, without a full reload.
+        Unchanged apps keep their entries and package info and the conan worker is kept.
+        """
+        config_file_path = Path(self._settings.get(LAST_CONFIG_FILE))
+        self._watch_config_file(config_file_path)
+        if not config_file_path.is_file() or not this.conan_worker:
+            return
+        if self._config_writer.is_written_content(config_file_path.read_text()):
+            return  # written by this application
+        new_tab_infos = parse_config_file(config_file_path, self._settings.get(CONFIG_READ_ONLY))
+        if not new_tab_infos:  # invalid - keep the current state
+            return
+        self._config_writer.discard_pending()  # the changes of the file win
+
+        # tabs are matched by name - tabs with the same name in their order
+        current_tabs: Dict[str, List[Tuple[TabEntry, TabUiGrid]]] = {}
+        for index, tab_info in enumerate(self._tab_info):
+            current_tabs.setdefault(tab_info.name, []).append((tab_info, self._ui.tabs.widget(index)))
+        tab_infos: List[TabEntry] = []
+        tabs: List[TabUiGrid] = []
+        added_apps: List[AppEntry] = []
+        removed_apps: List[AppEntry] = []
+        for new_tab_info in new_tab_infos:
+            if not current_tabs.get(new_tab_info.name):
+                tab_infos.append(new_tab_info)
+                tabs.append(self._create_tab(new_tab_info))
+                continue
+            tab_info, tab = current_tabs[new_tab_info.name].pop(0)
+            if tab in self._unloaded_tabs:  # nothing to keep
+                tab_info.set_app_records(new_tab_info.get_app_records())
+                tab_infos.append(tab_info)
+                tabs.append(tab)
+                continue
+            merged, added, removed = merge_app_entries(tab_info.get_app_entries(),
+                                                       new_tab_info.get_app_entries())
+            if added or removed or merged != tab_info.get_app_entries():
+                tab_info.set_app_entries(merged)
+                self._update_tab(tab, merged)
+            added_apps.extend(added)
+            removed_apps.extend(removed)
+            tab_infos.append(tab_info)
+            tabs.append(tab)
+        removed_tabs = [tab_entry for same_name_tabs in current_tabs.values() for tab_entry in same_name_tabs]
+        for tab_info, tab in removed_tabs:
+            removed_apps.extend(tab_info.get_loaded_app_entries())
+            self._unloaded_tabs.pop(tab, None)
+
+        # the worker and config writer share the list of tabs
+        self._tab_info[:] = tab_infos
+        mark_config_written(self._tab_info)
+        if [self._ui.tabs.widget(index) for index in range(self._ui.tabs.count())] != tabs:
+            current_tab = self._ui.tabs.currentWidget()
+            while self._ui.tabs.count() > 0:
+                self._ui.tabs.removeTab(0)
+            for tab_info, tab in zip(tab_infos, tabs):
+                self._ui.tabs.addTab(tab, tab_info.name)
+            if current_tab in tabs:
+                self._ui.tabs.setCurrentWidget(current_tab)
+        for _, tab in removed_tabs:
+            tab.setParent(None)
+            tab.deleteLater()
+        self._app_ui_entries = None  # rebuilt on the next update
+        this.conan_worker.update_app_entries(added_apps, removed_apps)
+        Logger().info(f"Reloaded config file: {len(added_apps)} apps added or changed, "
+                      f"{len(removed_apps)} removed")
 
     def update_layout(self):
         """ Update without cleaning up. Ungrey entries and set correct icon and add hover text """
         for tab in self._ui.tabs.findChildren(TabUiGrid):
             for app in tab.apps:
                 app.update_entry(self._settings)
-        self.save_all_configs()
+
+    def _on_conan_info_updated(self, conan_ref: str):
+        """ Collect the updated refs - a burst of updates is applied at once """
+        self._updated_refs.add(conan_ref)
+        if not self._refresh_timer.isActive():
+            self._refresh_timer.start()
+
+    def _refresh_updated_entries(self):
+        """ Update only the entries of the collected refs """
+        updated_refs, self._updated_refs = self._updated_refs, set()
+        for conan_ref in updated_refs:
+            for app in self._get_app_ui_entries(conan_ref):
+                app.update_entry(self._settings)
+
+    def _get_app_ui_entries(self, conan_ref: str) -> List[AppUiEntry]:
+        """
+        Get the entries with this ref. The registry is only rebuilt after it was invalidated -
+        refs of apps on not yet loaded tabs have no entries.
+        """
+        if self._app_ui_entries is None:
+            self._build_app_ui_entries()
+        return self._app_ui_entries.get(conan_ref, [])
+
+    def _invalidate_app_ui_entries(self):
+        self._app_ui_entries = None
+
+    def _build_app_ui_entries(self):
+        self._app_ui_entries = {}
+        for tab in self._ui.tabs.findChildren(TabUiGrid):
+            for app in tab.apps:
+                self._app_ui_entries.setdefault(str(app.app_info.conan_ref), []).append(app)
 
     def init_gui(self):
         """ Cleans up ui, reads config file and creates new layout """
         while self._ui.tabs.count() > 0:
             self._ui.tabs.removeTab(0)
+        self._app_ui_entries = None
+        self._updated_refs = set()
+        self._unloaded_tabs = {}
+        if self._config_writer:  # of the previous config file
+            self._config_writer.flush()
         config_file_path = Path(self._settings.get(LAST_CONFIG_FILE))
         if config_file_path.is_file():  # escape error log on first opening
-            self._tab_info = parse_config_file(config_file_path)
-        this.conan_worker = ConanWorker(self._tab_info, self.conan_info_updated)
+            self._tab_info = parse_config_file(config_file_path, self._settings.get(CONFIG_READ_ONLY))
+        self._config_writer = ConfigFileWriter(config_file_path, self._tab_info,
+                                               read_only=self._settings.get(CONFIG_READ_ONLY))
+        self._watch_config_file(config_file_path)
+        # create the layout first, so that it can be painted, while conan is initialized in the background
         self.create_layout()
+        this.conan_worker = ConanWorker(self._tab_info, self.conan_info_updated,
+                                        self._settings.get(CONAN_WORKER_NUM),
+                                        self._settings.get(CONAN_PROCESS_RESOLVER),
+                                        self._settings.get(CONAN_RECIPES_CACHE_TTL),
+                                        self._ui.tabs.currentIndex())
+        self._load_tab(self._ui.tabs.currentWidget())
+
+    def _on_tab_changed(self, tab_index: int):
+        """ Load the visible tab and resolve its apps first """
+        if tab_index < 0:
+            return
+        self._load_tab(self._ui.tabs.widget(tab_index))
+        if this.conan_worker:
+            this.conan_worker.set_active_tab(tab_index)
 
     def _re_init(self):
         """ To be called, when a new config file is loaded """
@@ -24,6 +24,14 @@ class AppButton(QtWidgets.QLabel, QtWidgets.QPushButton):
         self.open_fm_action = QtWidgets.QAction("Open in file manager", self)
         self.menu.addAction(self.open_fm_action)
 
+    @property
+    def image(self) -> Path:
+        return self._image
+
+    @property
+    def greyed_out(self) -> bool:
+        return self._greyed_out
+
     def ungrey_icon(self):
         self._greyed_out = False
         self.set_icon(self._image)
@@ -4,6 +4,9 @@ from pathlib import Path
 import pytest
 
 import conan_app_launcher.base as logger
+from conan_app_launcher.components.conan_api_pool import ConanApiPool
+from conan_app_launcher.components.conan_info_cache import ConanInfoCache
+from conan_app_launcher.components.conan_offline import ConanOfflineMode
 import conan_app_launcher as app
 
 
@@ -14,6 +17,33 @@ class PathSetup():
         self.testdata_path = self.test_path / "testdata"
 
 
+@pytest.fixture(autouse=True)
+def reset_offline_mode():
+    """ Without network the offline mode is switched on automatically - it must not leak into other tests """
+    yield
+    ConanOfflineMode().stop()
+    ConanOfflineMode._instance = None
+
+
+@pytest.fixture(autouse=True)
+def temp_cache_path(tmp_path_factory, monkeypatch):
+    """ Caches and snapshots must not be written to the home directory or be shared between tests """
+    monkeypatch.setattr(app, "cache_path", tmp_path_factory.mktemp("cache"))
+    ConanInfoCache._instances.clear()
+    yield
+    ConanInfoCache.flush_all()
+    ConanInfoCache._instances.clear()
+
+
+@pytest.fixture
+def conan_api_mock(mocker):
+    """ Replace the ConanApi of the pool - it finds no recipes, until the test sets other return values """
+    conan_api_mock = mocker.patch("conan_app_launcher.components.conan_api_pool.ConanApi")
+    conan_api_mock.return_value.get_cached_recipes.return_value = ([], float("inf"))
+    conan_api_mock.return_value.search_for_all_recipes.return_value = []
+    return conan_api_mock
+
+
 @pytest.fixture
 def base_fixture(request):
     paths = PathSetup()
@@ -28,6 +58,7 @@ def base_fixture(request):
     # reset singletons
     del(app.qt_app)
     app.qt_app = None
+    ConanApiPool._instance = None
     del(logger.Logger._instance)
     logger.Logger._instance = None
     app.base_path = None
@@ -135,7 +135,7 @@ def testConanCacheWithDialog(base_fixture, qtbot, mocker):
                         return_value=QtWidgets.QMessageBox.Yes)
 
     main_gui._ui.menu_cleanup_cache.trigger()
-    time.sleep(3)
+    qtbot.wait(3000)  # the search runs in the background and reports with signals
     assert not os.path.exists(pkg_cache_folder)
     assert not pkg_dir_to_delete.parent.exists()
     app.conan_worker.finish_working()
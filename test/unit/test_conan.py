@@ -1,11 +1,13 @@
 import os
+import threading
 import time
 import platform
+import pytest
 from conans.model.ref import ConanFileReference
 
-from conan_app_launcher.components.conan import _create_key_value_pair_list, ConanApi
-from conan_app_launcher.components.conan_worker import ConanWorker
-from conan_app_launcher.components import parse_config_file
+from conan_app_launcher.components.conan import _create_key_value_pair_list, ConanApi, ConanProfileSnapshot
+from conan_app_launcher.components.conan_offline import ConanOfflineMode
+from conan_app_launcher.components.conan_process_resolver import ConanProcessResolver
 
 
 def testEmptyCleanupCache():
@@ -17,6 +19,46 @@ def testEmptyCleanupCache():
     assert not paths
 
 
+def testCleanupCacheScan(tmp_path, mocker):
+    """
+    Test, that the cleanup scan finds package folders with broken short path links and short path folders
+    with a broken real path, and reports the progress for every checked ref and short path folder.
+    Expects the two orphaned folders, the progress up to the number of refs and short path folders
+    and no results after a cancel.
+    """
+    from conans.util.windows import CONAN_LINK, CONAN_REAL_PATH
+    packages_folder = tmp_path / "package"
+    short_paths_home = tmp_path / "short"
+    for folder in ["valid", "orphaned"]:
+        (packages_folder / folder).mkdir(parents=True)
+        (short_paths_home / folder).mkdir(parents=True)
+        (packages_folder / folder / CONAN_LINK).write_text(str(short_paths_home / folder))
+        (short_paths_home / folder / CONAN_REAL_PATH).write_text(str(packages_folder / folder))
+    (packages_folder / "no_short_path").mkdir()
+    (packages_folder / "orphaned" / CONAN_LINK).write_text(str(short_paths_home / "not_existing"))
+    (short_paths_home / "orphaned" / CONAN_REAL_PATH).write_text(str(packages_folder / "not_existing"))
+
+    conan = ConanApi()
+    mocker.patch("platform.system", return_value="Windows")
+    mocker.patch.object(conan, "_get_short_paths_home", return_value=str(short_paths_home))
+    mocker.patch.object(conan, "cache")
+    conan.cache.all_refs.return_value = [ConanFileReference.loads("example/1.0.0@user/stable"),
+                                         ConanFileReference.loads("other/1.0.0@user/stable")]
+    packages_folders = {"example": packages_folder, "other": tmp_path / "not_existing"}
+    conan.cache.package_layout.side_effect = lambda ref: mocker.Mock(**{
+        "packages.return_value": str(packages_folders[ref.name])})
+
+    progress = list(conan.iter_cleanup_cache_paths())
+    assert [checked_num for checked_num, _, _ in progress] == [1, 2, 3, 4]
+    assert all(all_num == 4 for _, all_num, _ in progress)
+    assert sorted(path for _, _, path in progress if path) == \
+        sorted([str(packages_folder / "orphaned"), str(short_paths_home / "orphaned")])
+
+    cancel = threading.Event()
+    cancel.set()
+    assert not list(conan.iter_cleanup_cache_paths(cancel))
+
+
 def testConanFindRemotePkg():
     """
     Test, if search_in_remotes finds a package for the current system and the specified options.
@@ -174,27 +216,192 @@ def testSearchForAllPackages():
     assert "zlib/1.2.8@conan/stable" in str(res)
 
 
-def testConanWorker(base_fixture):
+def testProfileSnapshot(tmp_path, mocker):
+    """
+    Test, that the default profile and remotes are only read again, if one of the files changed.
+    Expects one read for multiple updates and one more after a file modification.
+    """
+    profile_path = tmp_path / "default"
+    remotes_path = tmp_path / "remotes.json"
+    profile_path.write_text("")
+    remotes_path.write_text("")
+    cache = mocker.MagicMock()
+    cache.default_profile_path = str(profile_path)
+    cache.remotes_path = str(remotes_path)
+    cache.default_profile.settings = {"os": "Linux", "arch": "x86_64"}
+    cache.registry.load_remotes.return_value.items.return_value = [("remote1", None), ("remote2", None)]
+
+    snapshot = ConanProfileSnapshot(cache)
+    snapshot.update()
+    snapshot.update()
+    assert cache.registry.load_remotes.call_count == 1
+    assert snapshot.remotes == ["remote1", "remote2"]
+    assert "os=Linux" in snapshot.query
+    profile_hash = snapshot.profile_hash
+
+    cache.default_profile.settings = {"os": "Windows", "arch": "x86_64"}
+    os.utime(str(profile_path), (0, 1))
+    snapshot.update()
+    assert cache.registry.load_remotes.call_count == 2
+    assert "os=Windows" in snapshot.query
+    assert snapshot.profile_hash != profile_hash
+
+
+def testConcurrentRemoteSearch(mocker):
     """
-    Test, if conan worker works on the queue.
-    It is expected,that the queue size decreases over time.
+    Test, that all remotes are searched concurrently and the remote with the highest priority wins.
+    Expects the package of the first remote, the next remote, if the packages of a remote can't be filtered,
+    and that a miss only takes as long as the slowest remote.
     """
-    class DummySignal():
+    def search_packages(remote_manager, remote, conan_ref, query):
+        time.sleep(remote["delay"])
+        return [{"id": package_id, "options": {}, "settings": {}, "requires": [], "outdated": False}
+                for package_id in remote["id"].split()]
 
-        def emit(self):
-            pass
-    sig = DummySignal()
-    tab_info = parse_config_file(base_fixture.testdata_path / "app_config.json")
-    conan_worker = ConanWorker(tab_info, sig)
-    elements_before = conan_worker._conan_queue.qsize()
-    time.sleep(10)
+    conan = ConanApi()
+    mocker.patch.object(conan.profile_snapshot, "update", return_value=conan.profile_snapshot)
+    mocker.patch.object(conan, "get_default_options", return_value={})
+    mocker.patch.object(ConanApi, "_search_packages_in_remote", side_effect=search_packages)
+    conan.profile_snapshot.remotes = ["remote1", "remote2", "remote3"]
+    conan.profile_snapshot.remote_objects = {"remote1": {"id": "1", "delay": 1},
+                                             "remote2": {"id": "2", "delay": 0},
+                                             "remote3": {"id": "", "delay": 0}}
+    ref = ConanFileReference.loads("example/1.0.0@user/stable")
+    pkgs = conan.search_in_remotes(ref)
+    assert pkgs[0]["id"] == "1"
+
+    # choosing between two packages inspects the recipe
+    conan.profile_snapshot.remote_objects["remote1"]["id"] = "1 11"
+    conan.get_default_options.side_effect = Exception("Inspect failed")
+    pkgs = conan.search_in_remotes(ref)
+    assert pkgs[0]["id"] == "2"
+
+    for remote_object in conan.profile_snapshot.remote_objects.values():
+        remote_object.update({"id": "", "delay": 1})
+    start_time = time.time()
+    assert not conan.search_in_remotes(ref)
+    assert time.time() - start_time < 2
+
+
+def testOfflineMode(mocker):
+    """
+    Test, that the offline mode is switched on, if no remote can be reached, and that no remote is contacted then.
+    Expects a notification, no remote search in offline mode and no installation.
+    """
+    from conans.errors import ConanConnectionError
 
-    assert conan_worker._conan_queue.qsize() < elements_before
-    conan_worker.finish_working()
+    def search_packages(remote_manager, remote, conan_ref, query):
+        raise ConanConnectionError("No connection")
 
-    # conan_server
-    # conan remote add private http://localhost:9300/
-    # conan upload example/1.0.0@myself/testing -r private
-    # .conan_server
-    # [write_permissions]
-    # */*@*/*: *
+    conan = ConanApi()
+    mocker.patch.object(conan.profile_snapshot, "update", return_value=conan.profile_snapshot)
+    mocker.patch.object(ConanApi, "_search_packages_in_remote", side_effect=search_packages)
+    mocker.patch.object(ConanOfflineMode, "_recheck_connection")
+    conan.profile_snapshot.remotes = ["remote1", "remote2"]
+    conan.profile_snapshot.remote_objects = {"remote1": None, "remote2": None}
+    notifications = []
+    ConanOfflineMode().add_listener(notifications.append)
+    ref = ConanFileReference.loads("example/1.0.0@user/stable")
+
+    assert not conan.search_in_remotes(ref)
+    assert ConanOfflineMode().is_offline and not ConanOfflineMode().is_forced
+    assert notifications == [True]
+    assert ConanApi._search_packages_in_remote.call_count == 2
+
+    assert not conan.search_in_remotes(ref)
+    assert not conan.search_for_all_recipes(ref)
+    assert not conan.install_package(ref, {"id": "1", "options": {}, "settings": {}, "requires": [],
+                                           "outdated": False})
+    assert ConanApi._search_packages_in_remote.call_count == 2
+
+    # the user takes over
+    ConanOfflineMode().set_forced(False)
+    assert not ConanOfflineMode().is_offline
+    assert notifications == [True, False]
+
+
+def testPackageRanking(mocker):
+    """
+    Test, that packages are ranked by the scores of the users machine and the default options,
+    and that the user options are a hard requirement.
+    Expects the best scored packages with an explanation and no package for not existing options.
+    """
+    def pkg(id, build_type, compiler, version, shared):
+        return {"id": id, "options": {"shared": shared}, "outdated": False, "requires": [],
+                "settings": {"build_type": build_type, "compiler": compiler, "compiler.version": version}}
+    conan = ConanApi()
+    conan.profile_snapshot.settings = {"compiler": "gcc", "compiler.version": "9"}
+    mocker.patch.object(conan, "get_default_options", return_value={"shared": False})
+    ref = ConanFileReference.loads("example/1.0.0@user/stable")
+    pkgs = [pkg("debug", "Debug", "gcc", "9", "False"), pkg("clang", "Release", "clang", "9", "False"),
+            pkg("gcc8", "Release", "gcc", "8", "False"), pkg("shared", "Release", "gcc", "9", "True"),
+            pkg("gcc8_2", "Release", "gcc", "8", "False")]
+
+    ranked_pkgs = conan.rank_packages(ref, pkgs)
+    assert [ranked_pkg["package"]["id"] for ranked_pkg in ranked_pkgs] == \
+        ["gcc8", "gcc8_2", "clang", "shared", "debug"]
+    assert ranked_pkgs[0]["explanation"] == ["no debug build", "default options", "compiler gcc"]
+    assert [found_pkg["id"] for found_pkg in conan._filter_best_packages(ref, pkgs)] == ["gcc8", "gcc8_2"]
+    assert [found_pkg["id"] for found_pkg in
+            conan._filter_best_packages(ref, pkgs, {"shared": "True"})] == ["shared"]
+    assert not conan._filter_best_packages(ref, pkgs, {"shared": "Maybe"})
+    # equally ranked packages are selected by id, independent of their order
+    assert conan.select_best_package(ref, list(reversed(pkgs)))["id"] == "gcc8"
+    # a single candidate needs no recipe inspection
+    conan.get_default_options.reset_mock()
+    conan._filter_best_packages(ref, pkgs[:1])
+    conan.get_default_options.assert_not_called()
+
+    # compiler version matters more than options with custom weights
+    conan.ranking_weights["compiler_version"] = 16
+    assert [found_pkg["id"] for found_pkg in conan._filter_best_packages(ref, pkgs)] == ["shared"]
+
+
+def testProcessResolverOfflineSync(base_fixture, mocker):
+    """
+    Test, that the offline mode of the main process is applied in the resolver process without resetting
+    the automatic mode and that a failed connection in the resolver process is reported back.
+    Expects the connection failure in the result only for the resolution, which turned the offline mode on.
+    """
+    from conan_app_launcher.components import conan_process_resolver
+    from conan_app_launcher.components.conan import get_unresolved_result
+
+    def resolve_package(conan_ref, conan_options):
+        if not ConanOfflineMode().is_offline:
+            ConanOfflineMode().report_connection_error([])
+        return get_unresolved_result(conan_ref)
+
+    process_conan = mocker.patch.object(conan_process_resolver, "_process_conan")
+    process_conan.resolve_package.side_effect = resolve_package
+    ref = "example/1.0.0@user/stable"
+    assert conan_process_resolver._resolve_in_process(ref, {}, False, False)["connection_failed"]
+    assert not conan_process_resolver._resolve_in_process(ref, {}, False, True)["connection_failed"]
+    assert ConanOfflineMode().is_offline and not ConanOfflineMode().is_forced
+    process_conan.report_connection_error.assert_not_called()
+
+    ConanOfflineMode().set_forced(False)
+    process_conan.resolve_package.side_effect = lambda conan_ref, conan_options: get_unresolved_result(conan_ref)
+    conan_process_resolver._resolve_in_process(ref, {}, False, True)  # offline in the main process
+    process_conan.report_connection_error.assert_called_once()
+
+
+@pytest.mark.skipif(not ConanProcessResolver.IS_SUPPORTED, reason="needs Python 3.7")
+def testConanProcessResolver(base_fixture, capsys):
+    """
+    Test, that the process resolver returns the result record of the resolver process
+    and that a hanging process is stopped.
+    Expects an invalid path for an unknown ref and an error message on timeout.
+    """
+    ref = ConanFileReference.loads("nonexistant/1.0.0@user/stable")
+    resolver = ConanProcessResolver()
+    result = resolver.resolve_package(ref)
+    assert {key: value for key, value in result.items() if key != "connection_failed"} == \
+        {"ref": str(ref), "id": "", "folder": "NULL", "remote": "", "package_folder_bytes": 0}
+    assert result["connection_failed"] == ConanOfflineMode().is_offline  # reported by the resolver process
+    resolver.shutdown()
+
+    resolver = ConanProcessResolver(timeout_s=0.01)  # can't even start in this time
+    assert str(resolver.get_path_or_install(ref)) == "NULL"
+    captured = capsys.readouterr()
+    assert "timed out" in captured.err
+    assert resolver._executor is None
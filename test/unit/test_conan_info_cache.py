@@ -0,0 +1,105 @@
+from conans.model.ref import ConanFileReference
+
+from conan_app_launcher.components.conan import ConanApi
+from conan_app_launcher.components.conan_info_cache import ConanInfoCache
+
+
+def testPackageCacheHitAndInvalidation(tmp_path):
+    """
+    Test, that a resolved package is persisted and only valid as long as the package folder is unchanged.
+    Expects the cached id and folder, and no entry after the folder was modified or with other options.
+    """
+    ref = ConanFileReference.loads("example/1.0.0@user/stable")
+    options = {"shared": "True"}
+    pkg_folder = tmp_path / "package"
+    pkg_folder.mkdir()
+
+    cache = ConanInfoCache(tmp_path / "cache")
+    cache.update_package(ref, options, "hash", "123456", pkg_folder)
+    assert cache.get_package(ref, options, "hash") == ("123456", pkg_folder)
+    assert cache.get_package(ref, {}, "hash") is None
+    assert cache.get_package(ref, options, "other_hash") is None
+
+    # check file content with a new object (bypass singleton)
+    cache.flush()
+    ConanInfoCache._instances.clear()
+    cache = ConanInfoCache(tmp_path / "cache")
+    assert cache.get_package(ref, options, "hash") == ("123456", pkg_folder)
+
+    # modify folder
+    (pkg_folder / "new_file").touch()
+    pkg_folder_mtime = pkg_folder.stat().st_mtime
+    cache._data[cache._PACKAGES_SECTION][cache._get_package_key(ref, options, "hash")]["mtime"] = \
+        pkg_folder_mtime - 1
+    assert cache.get_package(ref, options, "hash") is None
+
+
+def testDeferredCacheWrite(tmp_path, mocker):
+    """
+    Test, that changes of the cache are collected and written at once.
+    Expects no write for the changes until the delay has passed or the cache is flushed, and one write for all.
+    """
+    mocker.patch.object(ConanInfoCache, "SAVE_DELAY_S", 60)
+    cache = ConanInfoCache(tmp_path / "cache")
+    save = mocker.spy(cache, "_save")
+    for i in range(10):
+        cache.update_recipes(f"example{i}/*@user/*", [f"example{i}/1.0.0@user/stable"])
+    save.assert_not_called()
+
+    cache.flush()
+    cache.flush()
+    save.assert_called_once()
+    ConanInfoCache._instances.clear()
+    assert ConanInfoCache(tmp_path / "cache").get_recipes("example9/*@user/*")[0] == ["example9/1.0.0@user/stable"]
+
+
+def testCorruptCacheFile(tmp_path):
+    """
+    Test, that a corrupt cache file does not break the application.
+    Expects an empty cache.
+    """
+    (tmp_path / ConanInfoCache.CACHE_FILE_NAME).write_text("{ no json")
+    cache = ConanInfoCache(tmp_path)
+    assert cache.get_package(ConanFileReference.loads("example/1.0.0@user/stable"), {}, "hash") is None
+
+
+def testGetPathOrInstallFromCache(tmp_path, mocker):
+    """
+    Test, that get_path_or_install returns a cached package without querying conan.
+    Expects the cached folder and no call to find_best_matching_packages.
+    """
+    ref = ConanFileReference.loads("example/1.0.0@user/stable")
+    pkg_folder = tmp_path / "package"
+    pkg_folder.mkdir()
+    conan = ConanApi(ConanInfoCache(tmp_path / "cache"))
+    conan.info_cache.update_package(ref, {}, conan.profile_snapshot.update().profile_hash, "123456", pkg_folder)
+    mocker.patch.object(ConanApi, "find_best_matching_packages")
+
+    assert conan.get_path_or_install(ref) == pkg_folder
+    ConanApi.find_best_matching_packages.assert_not_called()
+
+
+def testDefaultOptionsCache(tmp_path, mocker):
+    """
+    Test, that the default options of a recipe revision are only inspected once and the cache entry
+    is invalidated, when the export folder changes.
+    Expects one inspect call for the same revision and another after a change of the export folder.
+    """
+    ref = ConanFileReference.loads("example/1.0.0@user/stable")
+    conan = ConanApi(ConanInfoCache(tmp_path / "cache"))
+    mocker.patch.object(conan, "_get_recipe_state", return_value=("rev1", 1.0))
+    mocker.patch.object(conan.conan, "inspect", return_value={"default_options": ("shared=False",)})
+
+    assert conan.get_default_options(ref) == {"shared": "False"}
+    assert conan.get_default_options(ref) == {"shared": "False"}
+    assert conan.conan.inspect.call_count == 1
+
+    # persisted on disk
+    conan.info_cache.flush()
+    ConanInfoCache._instances.clear()
+    assert ConanInfoCache(tmp_path / "cache").get_default_options(ref, "rev1", 1.0) == {"shared": "False"}
+
+    # export folder changed
+    conan._get_recipe_state.return_value = ("rev1", 2.0)
+    assert conan.get_default_options(ref) == {"shared": "False"}
+    assert conan.conan.inspect.call_count == 2
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+from conans.model.ref import ConanFileReference
+
+from conan_app_launcher.components.conan_local_index import ConanLocalIndex
+
+
+class FakePackageLayout():
+
+    def __init__(self, packages_folder: Path):
+        self._packages_folder = packages_folder
+
+    def packages(self):
+        return str(self._packages_folder)
+
+
+class FakeClientCache():
+    """ Emulates the conan cache folder structure with only packages and conaninfos """
+
+    def __init__(self, store: Path):
+        self.store = store
+
+    def all_refs(self):
+        return [ConanFileReference.load_dir_repr(str(path.relative_to(self.store)).replace("\\", "/"))
+                for path in self.store.glob("*/*/*/*")]
+
+    def package_layout(self, conan_ref):
+        return FakePackageLayout(self.store / conan_ref.dir_repr() / "package")
+
+    def add_package(self, conan_ref: ConanFileReference, package_id: str, os_name: str, shared: str):
+        package_folder = self.store / conan_ref.dir_repr() / "package" / package_id
+        package_folder.mkdir(parents=True)
+        (package_folder / "conaninfo.txt").write_text(
+            f"[settings]\n    os={os_name}\n\n[options]\n    shared={shared}\n")
+        return package_folder
+
+
+def testLocalIndexSearch(tmp_path):
+    """
+    Test, that the index finds all packages of a ref with a query and picks up installed and removed packages.
+    Expects the same results as a conan search.
+    """
+    ref = ConanFileReference.loads("example/1.0.0@user/stable")
+    cache = FakeClientCache(tmp_path)
+    cache.add_package(ref, "1", "Linux", "True")
+    cache.add_package(ref, "2", "Windows", "False")
+    cache.add_package(ConanFileReference.loads("other/1.0.0@user/stable"), "3", "Linux", "True")
+
+    index = ConanLocalIndex(cache)
+    pkgs = index.search_packages(ref)
+    assert [pkg["id"] for pkg in pkgs] == ["1", "2"]
+    assert pkgs[0]["settings"] == {"os": "Linux"}
+    assert pkgs[0]["options"] == {"shared": "True"}
+    pkgs = index.search_packages(ref, "os=Windows")
+    assert [pkg["id"] for pkg in pkgs] == ["2"]
+    assert len(index._packages) == 2
+
+    # new and removed packages are updated
+    new_package_folder = cache.add_package(ref, "4", "Linux", "False")
+    pkgs = index.search_packages(ref, "os=Linux")
+    assert [pkg["id"] for pkg in pkgs] == ["1", "4"]
+    (new_package_folder / "conaninfo.txt").unlink()
+    new_package_folder.rmdir()
+    pkgs = index.search_packages(ref, "os=Linux")
+    assert [pkg["id"] for pkg in pkgs] == ["1"]
+    assert not index.search_packages(ConanFileReference.loads("nonexistant/1.0.0@user/stable"))
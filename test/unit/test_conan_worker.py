@@ -0,0 +1,342 @@
+import threading
+import time
+
+from conans.model.ref import ConanFileReference
+
+from conan_app_launcher.components.conan_worker import ConanWorker
+from conan_app_launcher.components.conan_api_pool import ConanApiPool
+from conan_app_launcher.components import parse_config_file, AppEntry, TabEntry
+
+
+def testConanWorker(base_fixture):
+    """
+    Test, if conan worker works on the queue.
+    It is expected,that the queue size decreases over time.
+    """
+    class DummySignal():
+
+        def emit(self, conan_ref):
+            pass
+    sig = DummySignal()
+    tab_info = parse_config_file(base_fixture.testdata_path / "app_config.json")
+    conan_worker = ConanWorker(tab_info, sig)
+    elements_before = conan_worker._conan_queue.qsize()
+    time.sleep(10)
+
+    assert conan_worker._conan_queue.qsize() < elements_before
+    conan_worker.finish_working()
+
+
+def testConanWorkerPool(base_fixture, conan_api_mock):
+    """
+    Test, that the conan worker resolves refs concurrently, with one ConanApi instance per worker.
+    Expects all apps to get their package folder, while all resolutions are running at the same time.
+    """
+    class DummySignal():
+
+        def emit(self, conan_ref):
+            pass
+
+    worker_threads = set()
+    all_running = threading.Barrier(4, timeout=10)  # breaks, if the resolutions are not concurrent
+
+    def get_path_or_install(conan_ref, conan_options):
+        worker_threads.add(threading.get_ident())
+        all_running.wait()
+        return base_fixture.testdata_path / conan_ref.name
+
+    conan_api_mock.return_value.get_path_or_install.side_effect = get_path_or_install
+    tab = TabEntry("Tab")
+    for i in range(4):
+        tab.add_app_entry(AppEntry({"name": f"App{i}", "conan_ref": f"app{i}/1.0.0@user/stable",
+                                    "executable": "", "icon": ""}))
+    conan_worker = ConanWorker([tab], DummySignal(), worker_num=4)
+    conan_worker._conan_queue.join()
+    conan_worker.finish_working()
+
+    for i, app in enumerate(tab.get_app_entries()):
+        assert app.package_folder == base_fixture.testdata_path / f"app{i}"
+    assert len(worker_threads) == 4
+
+
+def testConanWorkerFailedJob(base_fixture, conan_api_mock):
+    """
+    Test, that an error of a resolution does not stop the processing of the queue.
+    Expects the failed job to be removed, the conan api to be reinitialized
+    and the following requests to be resolved.
+    """
+    def get_path_or_install(conan_ref, conan_options):
+        if conan_ref.name == "broken":
+            raise RuntimeError("Conan broke")
+        return base_fixture.testdata_path / conan_ref.name
+
+    conan_api_mock.return_value.get_path_or_install.side_effect = get_path_or_install
+    tab = TabEntry("Tab")
+    tab.add_app_entry(AppEntry({"name": "App", "conan_ref": "broken/1.0.0@user/stable",
+                                "executable": "", "icon": ""}))
+    conan_worker = ConanWorker([tab], None, worker_num=1)
+    conan_worker._conan_queue.join()
+    assert not conan_worker._jobs and not conan_worker._app_requests
+
+    app = tab.get_app_entries()[0]
+    conan_worker.put_ref_in_queue("fixed/1.0.0@user/stable", {}, app)
+    conan_worker._conan_queue.join()
+    conan_worker.finish_working()
+    assert app.package_folder == base_fixture.testdata_path / "fixed"
+    conan_api_mock.return_value.init_api.assert_called_once()
+
+
+def testConanWorkerBackgroundInit(base_fixture, conan_api_mock):
+    """
+    Test, that conan is initialized in the background and queued refs wait until it is ready.
+    Expects the constructor to return immediately, no resolution before the initialization finished,
+    a timeout while waiting for it and the initialized ConanApi to be reused by one worker.
+    """
+    conan_ready = threading.Event()
+
+    def init_conan_api():
+        conan_ready.wait(10)
+        return conan_api_mock.return_value
+
+    conan_api_mock.return_value.get_path_or_install.return_value = base_fixture.testdata_path
+    conan_api_mock.side_effect = init_conan_api
+    tab = TabEntry("Tab")
+    tab.add_app_entry(AppEntry({"name": "App", "conan_ref": "app/1.0.0@user/stable",
+                                "executable": "", "icon": ""}))
+
+    start_time = time.time()
+    conan_worker = ConanWorker([tab], None, worker_num=1)
+    assert time.time() - start_time < 1
+    assert not conan_worker.wait_for_conan(0.5)
+    conan_api_mock.return_value.get_path_or_install.assert_not_called()
+
+    conan_ready.set()
+    assert conan_worker.wait_for_conan()
+    conan_worker._conan_queue.join()
+    for future in conan_worker._version_futures:
+        future.result()
+    conan_worker.finish_working()
+    conan_api_mock.return_value.get_path_or_install.assert_called_once()
+    assert conan_api_mock.call_count <= 2  # init and possibly a concurrent version getter
+    assert tab.get_app_entries()[0].package_folder == base_fixture.testdata_path
+
+
+def testConanWorkerRequestCoalescing(base_fixture, conan_api_mock):
+    """
+    Test, that identical requests are merged and requests superseded by a newer one of the same app are dropped.
+    Expects one resolution per ref and options, no resolution of the superseded ref
+    and the shared result on every app with the same ref and options.
+    """
+    import conan_app_launcher as app
+    first_resolution = threading.Event()
+    resolved_refs = []
+
+    def get_path_or_install(conan_ref, conan_options):
+        resolved_refs.append((str(conan_ref), conan_options))
+        first_resolution.wait(10)
+        return base_fixture.testdata_path / conan_ref.name / conan_ref.version
+
+    conan_api_mock.return_value.get_path_or_install.side_effect = get_path_or_install
+    tab = TabEntry("Tab")
+    for name, ref in [("App1", "app/1.0.0@user/stable"), ("App2", "app/1.0.0@user/stable"),
+                      ("App3", "other/1.0.0@user/stable")]:
+        tab.add_app_entry(AppEntry({"name": name, "conan_ref": ref, "executable": "", "icon": ""}))
+    app1, app2, app3 = tab.get_app_entries()
+
+    conan_worker = ConanWorker([tab], None, worker_num=1)
+    app.conan_worker = conan_worker
+    while not resolved_refs:  # the worker is busy with the first ref
+        time.sleep(0.1)
+    conan_worker.put_ref_in_queue("app/1.0.0@user/stable", {})  # merged into the running request
+    app3.conan_ref = "other/2.0.0@user/stable"  # supersedes the queued request
+    app3.conan_ref = "other/3.0.0@user/stable"
+    first_resolution.set()
+    conan_worker._conan_queue.join()
+    assert not conan_worker._jobs
+    conan_worker.finish_working()
+
+    assert resolved_refs == [("app/1.0.0@user/stable", {}), ("other/3.0.0@user/stable", {})]
+    assert app1.package_folder == app2.package_folder == base_fixture.testdata_path / "app" / "1.0.0"
+    assert app3.package_folder == base_fixture.testdata_path / "other" / "3.0.0"
+
+
+def testConanWorkerPriorities(base_fixture, conan_api_mock):
+    """
+    Test, that the apps of the active tab are resolved first and the jobs are reprioritized on a tab change.
+    Expects the apps of the newly active tab before the other tabs and requests without an app at last.
+    """
+    first_resolution = threading.Event()
+    resolved_refs = []
+
+    def get_path_or_install(conan_ref, conan_options):
+        resolved_refs.append(conan_ref.name)
+        first_resolution.wait(10)
+        return base_fixture.testdata_path
+
+    conan_api_mock.return_value.get_path_or_install.side_effect = get_path_or_install
+    tabs = []
+    for i in range(3):
+        tab = TabEntry(f"Tab{i}")
+        for j in range(2):
+            tab.add_app_entry(AppEntry({"name": f"App{j}", "conan_ref": f"app{i}{j}/1.0.0@user/stable",
+                                        "executable": "", "icon": ""}))
+        tabs.append(tab)
+
+    conan_worker = ConanWorker(tabs, None, worker_num=1, active_tab=1)
+    while not resolved_refs:  # the worker is busy with the first ref
+        time.sleep(0.1)
+    conan_worker.put_ref_in_queue("prefetch/1.0.0@user/stable", {})
+    conan_worker.set_active_tab(2)
+    first_resolution.set()
+    conan_worker._conan_queue.join()
+    conan_worker.finish_working()
+
+    assert resolved_refs == ["app10", "app20", "app21", "app00", "app01", "app11", "prefetch"]
+
+
+def testConanWorkerUnloadedTab(base_fixture, conan_api_mock):
+    """
+    Test, that the apps of a not yet loaded tab are resolved without creating their entries.
+    Expects the tab to stay unloaded and the results to be set on loading without resolving again.
+    """
+    from conan_app_launcher.components.config_file import AppRecord
+
+    conan_api_mock.return_value.get_path_or_install.return_value = base_fixture.testdata_path
+    tab = TabEntry("Tab")
+    for name, ref in [("App1", "app/1.0.0@user/stable"), ("App2", "invalid")]:
+        tab.add_app_record(AppRecord({"name": name, "conan_ref": ref, "executable": "", "icon": ""}))
+
+    conan_worker = ConanWorker([tab], None, worker_num=1)
+    conan_worker._conan_queue.join()
+    assert not tab.is_loaded
+    assert conan_api_mock.return_value.get_path_or_install.call_count == 1
+
+    app1, _ = tab.get_app_entries()
+    conan_worker.update_app_entries(tab.get_app_entries(), [])
+    conan_worker._conan_queue.join()
+    conan_worker.finish_working()
+    assert app1.package_folder == base_fixture.testdata_path
+    assert conan_api_mock.return_value.get_path_or_install.call_count == 2  # only the invalid ref
+
+
+def testConanApiPool(base_fixture, conan_api_mock):
+    """
+    Test, that the pool hands out returned instances again, reinitializes only broken ones
+    and evicts instances, which are idle too long.
+    Expects one construction for sequential leases, one init_api call after an error and
+    a new construction after the idle timeout.
+    """
+    pool = ConanApiPool()
+    with pool.leased() as conan:
+        pass
+    with pool.leased() as conan_again:
+        assert conan_again is conan
+    assert conan_api_mock.call_count == 1
+    conan.init_api.assert_not_called()
+
+    try:
+        with pool.leased():
+            raise RuntimeError("Conan broke")
+    except RuntimeError:
+        pass
+    pool.release(pool.lease())
+    conan.init_api.assert_called_once()
+
+    pool.idle_timeout_s = 0.1
+    time.sleep(0.5)  # evicted by the timer without using the pool
+    assert not pool._idle
+    pool.lease()
+    assert conan_api_mock.call_count == 2
+
+
+def testVersionsFromRecipesCache(base_fixture, conan_api_mock):
+    """
+    Test, that cached versions are set immediately and only searched again, if they are older than the ttl.
+    Expects no search for fresh entries and a gui update only, when the searched list is different.
+    """
+    class CountingSignal():
+        count = 0
+
+        def emit(self, conan_ref):
+            self.count += 1
+
+    ref = "app/1.0.0@user/stable"
+    cached_refs = [ConanFileReference.loads(ref)]
+    conan_api_mock.return_value.get_cached_recipes.return_value = (cached_refs, 10)
+    conan_api_mock.return_value.search_for_all_recipes.return_value = cached_refs
+    tab = TabEntry("Tab")
+    app = AppEntry({"name": "App", "conan_ref": ref, "executable": "", "icon": ""})
+    tab.add_app_entry(app)
+    signal = CountingSignal()
+    conan_worker = ConanWorker([], signal, recipes_cache_ttl_s=100)
+    conan_worker._tabs = [tab]  # don't resolve, only test the version getter
+
+    # fresh cache
+    conan_worker._get_packages_versions(ref)
+    assert app.versions == ["1.0.0"]
+    conan_api_mock.return_value.search_for_all_recipes.assert_not_called()
+    assert signal.count == 1
+
+    # stale cache, but same result
+    conan_api_mock.return_value.get_cached_recipes.return_value = (cached_refs, 1000)
+    conan_worker._get_packages_versions(ref)
+    conan_api_mock.return_value.search_for_all_recipes.assert_called_once()
+    assert signal.count == 2
+
+    # stale cache with new version
+    conan_api_mock.return_value.search_for_all_recipes.return_value = cached_refs + \
+        [ConanFileReference.loads("app/2.0.0@user/stable")]
+    conan_worker._get_packages_versions(ref)
+    assert sorted(app.versions) == ["1.0.0", "2.0.0"]
+    assert signal.count == 4
+    conan_worker.finish_working()
+
+
+def testVersionSearchCoalescing(base_fixture, conan_api_mock):
+    """
+    Test, that refs with the same search pattern are searched only once and all of them get the result.
+    Expects one search per pattern and the versions on every app with this pattern.
+    """
+    conan_api_mock.return_value.search_for_all_recipes.side_effect = lambda conan_ref: [
+        ConanFileReference.loads(f"{conan_ref.name}/3.0.0@{conan_ref.user}/stable")]
+    tab = TabEntry("Tab")
+    refs = ["app/1.0.0@user/stable", "app/2.0.0@user/testing", "app/1.0.0@other/stable"]
+    for i, ref in enumerate(refs):
+        tab.add_app_entry(AppEntry({"name": f"App{i}", "conan_ref": ref, "executable": "", "icon": ""}))
+
+    conan_worker = ConanWorker([tab], None)
+    for future in conan_worker._version_futures:
+        future.result()
+    conan_worker.finish_working()
+
+    assert conan_api_mock.return_value.search_for_all_recipes.call_count == 2
+    for app in tab.get_app_entries():
+        assert app.versions == ["3.0.0"]
+
+
+def testConanWorkerKeepsResolverProcess(base_fixture, conan_api_mock, mocker):
+    """
+    Test, that the resolver process of the worker is kept warm, after the queue was processed.
+    Expects one resolver for all requests, which is only shut down, when the worker finishes,
+    and no resolver processes on unsupported Python versions.
+    """
+    resolver_mock = mocker.patch("conan_app_launcher.components.conan_worker.ConanProcessResolver")
+    resolver_mock.return_value.get_path_or_install.return_value = base_fixture.testdata_path
+
+    conan_worker = ConanWorker([], None, worker_num=1, use_processes=True)
+    for i in range(3):
+        conan_worker.put_ref_in_queue(f"app{i}/1.0.0@user/stable", {})
+        conan_worker._conan_queue.join()
+        while not conan_worker._resolvers:  # the resolver is released after the queue is done
+            time.sleep(0.01)
+    resolver_mock.return_value.shutdown.assert_not_called()
+    conan_worker.finish_working()
+
+    assert resolver_mock.call_count == 1
+    assert resolver_mock.return_value.get_path_or_install.call_count == 3
+    resolver_mock.return_value.shutdown.assert_called_once()
+
+    resolver_mock.IS_SUPPORTED = False
+    conan_worker = ConanWorker([], None, use_processes=True)
+    conan_worker.finish_working()
+    assert not conan_worker._use_processes
@@ -206,3 +206,204 @@ def testOptionsEval(base_fixture):
     # empty value
     app.conan_options = []
     assert app.conan_options == {}
+
+
+def testConfigFileWriter(base_fixture, tmp_path, mocker):
+    """
+    Tests, that the config writer coalesces write requests and writes only changed content.
+    Expects no write without a change, one write for a burst of requests and no write for reverted changes.
+    """
+    from conan_app_launcher.components import ConfigFileWriter
+    from conan_app_launcher.components import config_writer
+
+    config_file_path = tmp_path / "app_config.json"
+    copy_file(str(base_fixture.testdata_path / "app_config.json"), str(config_file_path))
+    tabs = parse_config_file(config_file_path)
+    write_file_atomic = mocker.spy(config_writer, "write_file_atomic")
+    writer = ConfigFileWriter(config_file_path, tabs, debounce_s=0.2)
+
+    writer.request_write()
+    writer.flush()
+    assert write_file_atomic.call_count == 0
+
+    app = tabs[0].get_app_entries()[0]
+    for i in range(5):
+        app.name = f"New name {i}"
+        writer.request_write()
+    writer._timer.join(10)  # the timer of the last request
+    assert write_file_atomic.call_count == 1
+    with open(str(config_file_path)) as config_file:
+        assert json.load(config_file)["tabs"][0]["apps"][0]["name"] == "New name 4"
+
+    app.name = "Other name"
+    app.name = "New name 4"
+    writer.request_write()
+    writer.flush()
+    assert write_file_atomic.call_count == 1
+    assert list(tmp_path.iterdir()) == [config_file_path]  # no temporary file left
+
+
+def testCachedValidation(base_fixture, tmp_path, mocker):
+    """
+    Tests, that the schema is compiled once and an unchanged config file is not validated again.
+    Expects one validation for two loads of the same content and a validation after a manual change.
+    """
+    from conan_app_launcher.components import config_file
+
+    config_file_path = tmp_path / "app_config.json"
+    copy_file(str(base_fixture.testdata_path / "app_config.json"), str(config_file_path))
+    parse_config_file(config_file_path)  # migrates the file to the latest version
+    validate_config = mocker.spy(config_file, "_validate_config")
+    validator = config_file._get_config_validator()
+
+    assert len(parse_config_file(config_file_path)) == 2
+    validate_config.assert_not_called()
+
+    with open(str(config_file_path)) as config:
+        app_config = json.load(config)
+    app_config["tabs"][0]["name"] = "Changed"
+    with open(str(config_file_path), "w") as config:
+        json.dump(app_config, config)
+    assert parse_config_file(config_file_path)[0].name == "Changed"
+    validate_config.assert_called_once()
+    assert config_file._get_config_validator() is validator
+
+
+def testConfigSnapshot(base_fixture, tmp_path, mocker):
+    """
+    Tests, that an unchanged config file is restored from the snapshot of the last load.
+    Expects the same model without json parsing and validation of the entries
+    and a new parse after the file changed.
+    """
+    from conan_app_launcher.components import config_file
+
+    config_file_path = tmp_path / "app_config.json"
+    copy_file(str(base_fixture.testdata_path / "app_config.json"), str(config_file_path))
+    tabs = parse_config_file(config_file_path)
+    json_loads = mocker.spy(config_file.json, "loads")
+    from_snapshot = mocker.spy(config_file.AppEntry, "from_snapshot")
+
+    restored_tabs = parse_config_file(config_file_path)
+    json_loads.assert_not_called()
+    restored_apps_num = sum(len(restored_tab.get_app_entries()) for restored_tab in restored_tabs)
+    assert restored_apps_num > 0 and from_snapshot.call_count == restored_apps_num
+    assert [tab.name for tab in restored_tabs] == [tab.name for tab in tabs]
+    for tab, restored_tab in zip(tabs, restored_tabs):
+        for app_entry, restored_app in zip(tab.get_app_entries(), restored_tab.get_app_entries()):
+            assert restored_app.app_data == app_entry.app_data
+            assert restored_app.conan_ref == app_entry.conan_ref
+            assert restored_app.conan_options == app_entry.conan_options
+            assert restored_app.icon == app_entry.icon
+
+    tabs[0].get_app_entries()[0].name = "Changed"
+    with open(str(config_file_path), "w") as config:
+        config.write(config_file.dump_config(tabs))
+    assert parse_config_file(config_file_path)[0].get_app_entries()[0].name == "Changed"
+    json_loads.assert_called_once()
+
+
+def testWriteBackOnlyMigrated(base_fixture, tmp_path):
+    """
+    Tests, that a config file is only written back, if it was migrated and is not read only.
+    Expects an unchanged file for the latest version and a read only config and a migrated file otherwise.
+    """
+    from conan_app_launcher.components.config_writer import ConfigFileWriter
+
+    latest_file = tmp_path / "app_config.json"
+    copy_file(str(base_fixture.testdata_path / "app_config.json"), str(latest_file))
+    parse_config_file(latest_file)  # migrate once
+    mtime = latest_file.stat().st_mtime_ns
+    latest_content = latest_file.read_text()
+    tabs = parse_config_file(latest_file)
+    assert latest_file.stat().st_mtime_ns == mtime and latest_file.read_text() == latest_content
+
+    old_file = tmp_path / "update.json"
+    copy_file(str(base_fixture.testdata_path / "config_file" / "update.json"), str(old_file))
+    content = old_file.read_text()
+    assert parse_config_file(old_file, read_only=True)[0].get_app_entries()[0].conan_ref
+    assert old_file.read_text() == content
+    parse_config_file(old_file)
+    assert json.loads(old_file.read_text())["version"] == "0.3.0"
+
+    tabs[0].get_app_entries()[0].name = "Changed"
+    assert not ConfigFileWriter(latest_file, tabs, read_only=True).write()
+    assert latest_file.read_text() == latest_content
+
+
+def testWriteFileAtomic(tmp_path):
+    """
+    Tests, that the atomic write of a config file keeps a symlink and the permissions of the file.
+    Expects the new content in the target of the symlink with the original mode.
+    """
+    import os
+    import stat
+    from conan_app_launcher.components.config_file import write_file_atomic
+
+    target_path = tmp_path / "shared" / "app_config.json"
+    target_path.parent.mkdir()
+    target_path.write_text("{}")
+    os.chmod(str(target_path), 0o664)
+    link_path = tmp_path / "app_config.json"
+    try:
+        link_path.symlink_to(target_path)
+    except OSError:  # no permission to create symlinks, e.g. on Windows
+        link_path = target_path
+
+    write_file_atomic(link_path, '{"version": "0.3.0"}')
+    assert link_path.read_text() == target_path.read_text() == '{"version": "0.3.0"}'
+    assert link_path.is_symlink() or link_path == target_path
+    if platform.system() != "Windows":
+        assert stat.S_IMODE(target_path.stat().st_mode) == 0o664
+    assert list(target_path.parent.iterdir()) == [target_path]
+
+
+def testLazyAppEntries(base_fixture, tmp_path, mocker):
+    """
+    Tests, that the apps of a tab are created on first access only.
+    Expects no app entry after parsing and dumping the config and all entries of a tab after the first access.
+    """
+    from conan_app_launcher.components import config_file
+
+    config_file_path = tmp_path / "app_config.json"
+    copy_file(str(base_fixture.testdata_path / "app_config.json"), str(config_file_path))
+    parse_config_file(config_file_path)  # migrate once
+    app_entry_init = mocker.spy(AppEntry, "__init__")
+    from_snapshot = mocker.spy(AppEntry, "from_snapshot")
+    tabs = parse_config_file(config_file_path)
+    content = config_file_path.read_text()
+
+    assert not any(tab.is_loaded for tab in tabs)
+    assert json.loads(config_file.dump_config(tabs)) == json.loads(content)
+    app_entry_init.assert_not_called()
+    from_snapshot.assert_not_called()
+
+    app_entries = tabs[0].get_app_entries()
+    assert tabs[0].is_loaded and not tabs[1].is_loaded
+    created_num = app_entry_init.call_count + from_snapshot.call_count
+    assert created_num == len(app_entries) == len(json.loads(content)["tabs"][0]["apps"])
+    assert tabs[0].get_app_entries() is app_entries
+    assert not hasattr(app_entries[0], "__dict__")  # slots only
+
+
+def testMergeAppEntries(base_fixture):
+    """
+    Tests, that reloaded apps are merged into the current ones by name.
+    Expects unchanged apps to be kept, changed apps with the same ref to keep the package info
+    and removed and added apps to be reported.
+    """
+    from conan_app_launcher.components.config_file import merge_app_entries
+
+    def create_app(name, conan_ref, args=""):
+        return AppEntry({"name": name, "conan_ref": conan_ref, "executable": "", "icon": "", "args": args})
+
+    current_apps = [create_app("App1", "app1/1.0.0@user/stable"), create_app("App2", "app2/1.0.0@user/stable"),
+                    create_app("App3", "app3/1.0.0@user/stable")]
+    current_apps[1].package_folder = base_fixture.testdata_path
+    new_apps = [create_app("App2", "app2/1.0.0@user/stable", "--new"), create_app("App1", "app1/1.0.0@user/stable"),
+                create_app("App4", "app4/1.0.0@user/stable")]
+
+    merged, added, removed = merge_app_entries(current_apps, new_apps)
+    assert merged == [new_apps[0], current_apps[0], new_apps[2]]
+    assert added == [new_apps[0], new_apps[2]]
+    assert removed == [current_apps[1], current_apps[2]]
+    assert new_apps[0].package_folder == base_fixture.testdata_path
@@ -0,0 +1,64 @@
+import os
+
+from conan_app_launcher.components.folder_deleter import FolderDeleter
+
+
+def create_tree(path, files_num: int, file_size: int):
+    (path / "sub").mkdir(parents=True)
+    for i in range(files_num):
+        (path / "sub" / f"file{i}").write_bytes(b"0" * file_size)
+
+
+def testDeleteFoldersInBackground(tmp_path):
+    """
+    Test, that folders are moved out of the way immediately and deleted in the background.
+    Expects the folders to be gone after the call, the freed bytes and entries and an empty journal.
+    """
+    folders = [tmp_path / "data" / "folder1", tmp_path / "data" / "folder2"]
+    for folder in folders:
+        create_tree(folder, 3, 100)
+    deleter = FolderDeleter(tmp_path / "cache")
+
+    future = deleter.delete([str(folder) for folder in folders])
+    for folder in folders:
+        assert not folder.exists()
+    assert future.result(10) == (600, 10)  # 6 files, 2 sub folders, 2 folders
+    assert not os.listdir(str(tmp_path / "data"))
+    assert FolderDeleter(tmp_path / "cache")._journal == []
+    deleter.shutdown()
+
+
+def testPurgeTrashLeftovers(tmp_path):
+    """
+    Test, that trash folders of an interrupted deletion are deleted at the next start.
+    Expects no trash folder after purging.
+    """
+    folder = tmp_path / "data" / "folder"
+    create_tree(folder, 2, 10)
+    deleter = FolderDeleter(tmp_path / "cache")
+    deleter.shutdown()  # interrupted before the deletion could start
+    deleter.delete([str(folder)])
+    trash_folders = os.listdir(str(tmp_path / "data"))
+    assert len(trash_folders) == 1 and trash_folders[0].startswith(FolderDeleter.TRASH_PREFIX)
+
+    deleter = FolderDeleter(tmp_path / "cache")
+    assert deleter.purge_leftovers().result(10) == (20, 4)
+    assert not os.listdir(str(tmp_path / "data"))
+    deleter.shutdown()
+
+
+def testTrashInTrashDir(tmp_path):
+    """
+    Test, that a folder is moved into the trash dir next to the parent folder, which contains it.
+    Expects the trash folder in the trash dir and no trash folder next to the deleted folder.
+    """
+    storage = tmp_path / "conan" / "data"
+    folder = storage / "pkg" / "1.0" / "user" / "stable" / "package" / "123"
+    create_tree(folder, 1, 10)
+    trash_dir = tmp_path / "conan" / FolderDeleter.TRASH_DIR_NAME
+    deleter = FolderDeleter(tmp_path / "cache")
+    deleter.shutdown()  # keep the trash folder
+
+    deleter.delete([str(folder)], [str(tmp_path / "other" / FolderDeleter.TRASH_DIR_NAME), str(trash_dir)])
+    assert not os.listdir(str(folder.parent))
+    assert len(os.listdir(str(trash_dir))) == 1
@@ -70,3 +70,89 @@ def testOpenApp(base_fixture, qtbot):
         line = lines[3].replace(" ", "")
         pid = line.split("python.exe")[1].split("Console")[0]
         os.system("taskkill /PID " + pid)
+
+
+def testTargetedEntryUpdates(base_fixture, qtbot, mocker, tmp_path):
+    """
+    Test, that a conan info update refreshes only the entries of the updated ref once per frame.
+    Expects one update of the single entry with this ref for a burst of signals and no config file write.
+    Refs without an entry, e.g. of not yet loaded tabs, don't rebuild the registry of the entries.
+    """
+    from conan_app_launcher.settings import LAST_CONFIG_FILE, Settings
+
+    mocker.patch("conan_app_launcher.ui.main_ui.ConanWorker")
+    settings = Settings(ini_file=tmp_path / "config.ini")
+    settings.set(LAST_CONFIG_FILE, str(base_fixture.testdata_path / "app_config.json"))
+    main_gui = main_ui.MainUi(settings)
+    qtbot.addWidget(main_gui)
+    update_entry = mocker.patch.object(AppUiEntry, "update_entry", autospec=True)
+    request_write = mocker.patch("conan_app_launcher.ui.main_ui.ConfigFileWriter.request_write")
+
+    for _ in range(10):
+        main_gui.conan_info_updated.emit("zlib/1.2.11@conan/stable")
+    qtbot.waitUntil(lambda: update_entry.call_count > 0)
+    qtbot.wait(100)
+
+    assert update_entry.call_count == 1
+    assert str(update_entry.call_args[0][0].app_info.conan_ref) == "zlib/1.2.11@conan/stable"
+    request_write.assert_not_called()
+
+    build_app_ui_entries = mocker.spy(main_gui, "_build_app_ui_entries")
+    for i in range(3):
+        main_gui.conan_info_updated.emit(f"unknown/{i}.0.0@user/stable")
+        qtbot.wait(50)
+    build_app_ui_entries.assert_not_called()
+    assert update_entry.call_count == 1
+    Logger.remove_qt_logger()
+
+
+def testConfigFileHotReload(base_fixture, qtbot, mocker, tmp_path):
+    """
+    Test, that an external change of the config file is applied without a full reload.
+    Expects the entries of unchanged apps to be kept, the changed and removed apps to be passed to the worker
+    and a removed tab to be deleted. The apps of the never shown removed tab were not created.
+    Tabs with the same name are kept in their order.
+    """
+    import json
+    from distutils.file_util import copy_file
+    from conan_app_launcher.settings import LAST_CONFIG_FILE, Settings
+
+    conan_worker_mock = mocker.patch("conan_app_launcher.ui.main_ui.ConanWorker")
+    config_file_path = tmp_path / "app_config.json"
+    copy_file(str(base_fixture.testdata_path / "app_config.json"), str(config_file_path))
+    settings = Settings(ini_file=tmp_path / "config.ini")
+    settings.set(LAST_CONFIG_FILE, str(config_file_path))
+    main_gui = main_ui.MainUi(settings)
+    qtbot.addWidget(main_gui)
+    first_tab = main_gui._ui.tabs.widget(0)
+    app_uis = list(first_tab.apps)
+    conan_worker_mock.return_value.update_app_entries.reset_mock()  # called for the loaded first tab
+
+    app_config = json.loads(config_file_path.read_text())
+    app_config["tabs"][0]["apps"][1]["args"] = "--changed"
+    removed_tab = app_config["tabs"].pop(1)
+    config_file_path.write_text(json.dumps(app_config, indent=4))
+    qtbot.waitUntil(lambda: conan_worker_mock.return_value.update_app_entries.called, timeout=5000)
+
+    assert main_gui._ui.tabs.count() == 1 and main_gui._ui.tabs.widget(0) is first_tab
+    assert first_tab.apps[0] is app_uis[0] and first_tab.apps[1] is not app_uis[1]
+    assert first_tab.apps[1].app_info.args == "--changed"
+    added_apps, removed_apps = conan_worker_mock.return_value.update_app_entries.call_args[0]
+    assert added_apps == [first_tab.apps[1].app_info]
+    assert len(removed_tab["apps"]) > 0 and len(removed_apps) == 1
+    assert app_uis[1].app_info in removed_apps
+
+    conan_worker_mock.return_value.update_app_entries.reset_mock()
+    app_config["tabs"].append(json.loads(json.dumps(app_config["tabs"][0])))
+    config_file_path.write_text(json.dumps(app_config, indent=4))
+    qtbot.waitUntil(lambda: conan_worker_mock.return_value.update_app_entries.called, timeout=5000)
+    same_name_tab = main_gui._ui.tabs.widget(1)
+    assert main_gui._ui.tabs.count() == 2 and main_gui._ui.tabs.widget(0) is first_tab
+
+    conan_worker_mock.return_value.update_app_entries.reset_mock()
+    app_config["tabs"][1]["apps"][0]["args"] = "--changed"
+    config_file_path.write_text(json.dumps(app_config, indent=4))
+    qtbot.waitUntil(lambda: conan_worker_mock.return_value.update_app_entries.called, timeout=5000)
+    assert main_gui._ui.tabs.count() == 2
+    assert main_gui._ui.tabs.widget(0) is first_tab and main_gui._ui.tabs.widget(1) is same_name_tab
+    Logger.remove_qt_logger()
@@ -0,0 +1,43 @@
+import json
+
+from conan_app_launcher import headless
+from conan_app_launcher.settings import CONFIG_READ_ONLY, Settings
+
+
+def testWarmReport(base_fixture, tmp_path, conan_api_mock, mocker, capsys):
+    """
+    Test, that the warm command resolves every unique ref of a config file once and prints a json report.
+    Expects one resolution per ref and options, the remote and the size of the installed package folders
+    in the report, a failed ref for an error of a resolution and an error return code for an unresolved ref.
+    The config file is only read, if the settings say so.
+    """
+    def resolve_package(conan_ref, conan_options):
+        if conan_ref.name == "broken":
+            raise RuntimeError("Conan broke")
+        if conan_ref.name == "missing":
+            return {"ref": str(conan_ref), "id": "", "folder": "NULL", "remote": "",
+                    "package_folder_bytes": 0}
+        return {"ref": str(conan_ref), "id": "123", "folder": str(tmp_path), "remote": "remote1",
+                "package_folder_bytes": 100}
+
+    config_file = tmp_path / "app_config.json"
+    refs = ["app/1.0.0@user/stable", "app/1.0.0@user/stable", "broken/1.0.0@user/stable",
+            "missing/1.0.0@user/stable"]
+    apps = [{"name": f"App{i}", "conan_ref": ref, "executable": "bin/app", "icon": ""}
+            for i, ref in enumerate(refs)]
+    config_file.write_text(json.dumps({"version": "0.3.0", "tabs": [{"name": "Tab", "apps": apps}]}))
+    conan_api_mock.return_value.resolve_package.side_effect = resolve_package
+    mocker.patch.object(headless.Path, "home", return_value=tmp_path)
+    Settings(ini_file=tmp_path / ".cal_config").set(CONFIG_READ_ONLY, True)
+    parse_config_file = mocker.spy(headless, "parse_config_file")
+
+    assert headless.main([str(config_file), "--jobs", "2"]) == 1
+    report = json.loads(capsys.readouterr().out)
+    parse_config_file.assert_called_once_with(config_file, True)
+    assert conan_api_mock.return_value.resolve_package.call_count == 3
+    assert report["resolved"] == 1 and report["failed"] == 2
+    assert report["package_folder_bytes"] == 100
+    assert report["refs"][0]["ref"] == "app/1.0.0@user/stable"
+    assert report["refs"][0]["remote"] == "remote1"
+    assert report["refs"][1]["resolved"] is False and report["refs"][1]["error"] == "Conan broke"
+    assert report["refs"][2]["resolved"] is False and not report["refs"][2]["error"]